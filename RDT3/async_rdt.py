@@ -0,0 +1,725 @@
+"""
+@Purpose: Multi-session RDT 3.0 endpoints built on asyncio.
+The blocking Sender and Receiver each own one UDP socket and serve exactly one
+peer. This module runs many independent reliable sessions over a single
+socket per endpoint: every segment carries a connection id, and the endpoints
+demultiplex on (peer address, connection id). Each session keeps its own
+sequence numbers, retransmission timer and delivery queue, so one receiver can
+ingest from hundreds of senders in one process.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import asyncio
+from collections import deque
+
+from congestion import CongestionWindow, RttEstimator
+from stats import (ConnectionStats, TRACE_OFF, TRACE_EVENTS, TRACE_PACKETS,
+                   RETX_TIMEOUT, RETX_DUP_ACK, RETX_NAK, RETX_PARTIAL_ACK,
+                   RETX_WINDOW_OPEN)
+from util import (make_segment, parse_segment, pack_seq_list,
+                  unpack_seq_list, SEGMENT_HEADER_LEN, TYPE_DATA, TYPE_ACK,
+                  TYPE_FIN, TYPE_NAK, TYPE_RST)
+
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_RECV_WINDOW = 64    # segments
+DEFAULT_SESSION_TIMEOUT = 60.0  # seconds a receiver session may sit idle
+DEFAULT_TIME_WAIT = 30.0    # seconds a closed session's final ACK is kept
+DEFAULT_MAX_RETRIES = 10   # timeouts in a row without any ACK
+DUP_ACK_THRESHOLD = 3
+MAX_NAK_ENTRIES = 64
+
+
+class SenderSession:
+    """
+    The sending half of one reliable session.
+
+    Segments are pipelined up to min(max_window, cwnd, receiver window); with
+    max_window=1 the session degenerates to RDT 3.0 stop-and-wait. ACKs are
+    cumulative and carry the next sequence number the receiver expects plus
+    its advertised window. A single timer covers the oldest unacked segment,
+    and its timeout follows the measured RTT.
+
+    Most losses are repaired without waiting for the timer: DUP_ACK_THRESHOLD
+    duplicate ACKs (one in stop-and-wait) trigger a fast retransmit of the
+    oldest segment, and a NAK from the receiver names the exact segments to
+    resend. Either way the window is halved once per loss episode.
+
+    The session fails with ConnectionError, like a TCP connection, when the
+    receiver answers with a reset (it no longer knows the session, e.g. after
+    expiring it as idle) or when max_retries timeouts in a row bring no ACK.
+
+    Args:
+        endpoint (SenderEndpoint): the endpoint owning the socket.
+        peer (tuple): the receiver's (host, port).
+        conn_id (int): the connection id carried in every segment.
+        timeout (float): the retransmission timeout before the first RTT sample.
+        max_window (int): upper bound on segments in flight.
+        max_retries (int): timeouts in a row without an ACK before the
+            session fails (0 or None: retry forever).
+    """
+    def __init__(self, endpoint, peer, conn_id, timeout=DEFAULT_TIMEOUT,
+                 max_window=1, max_retries=DEFAULT_MAX_RETRIES):
+        self.endpoint = endpoint
+        self.peer = peer
+        self.conn_id = conn_id
+        self.max_window = max_window
+        self.max_retries = max_retries
+        self.base = 0
+        self.next_seq = 0
+        self.rwnd = DEFAULT_RECV_WINDOW
+        self.congestion = CongestionWindow(max_window) if max_window > 1 else None
+        self.rtt = RttEstimator(timeout)
+        self.closed = False
+        self.telemetry = ConnectionStats(
+            'sender conn {} -> {}:{}'.format(conn_id, *peer[:2]))
+        self.fast_retransmits = 0
+        self.timeouts = 0           # counted here as well as in congestion,
+        self.loss_events = 0        # which stop-and-wait does not have
+        self._queue = deque()
+        self._unacked = {}
+        self._recover = 0
+        self._retx_next = 0
+        self._dup_acks = 0
+        self._fast_recover = 0
+        self._retries = 0
+        self._drain_waiters = []
+        self._timer = None
+
+    async def send(self, data):
+        """
+        Queue one message and wait until it has been admitted to the window.
+
+        Call flush() (or close()) to wait for everything to be acknowledged.
+
+        Args:
+            data (str | bytes): the message; strings are UTF-8 encoded.
+        """
+        if self.closed:
+            raise ConnectionError('session {} is closed'.format(self.conn_id))
+        if isinstance(data, str):
+            data = data.encode()
+        await self._enqueue(TYPE_DATA, data)
+
+    async def flush(self):
+        """Wait until every queued segment has been acknowledged."""
+        if not self._queue and not self._unacked:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(future)
+        await future
+
+    async def close(self):
+        """Send a FIN, wait for it to be acknowledged and release the session."""
+        if self.closed:
+            return
+        await self._enqueue(TYPE_FIN, b'')
+        await self.flush()
+        self.closed = True
+        self._cancel_timer()
+        self.endpoint._forget(self)
+
+    def stats(self):
+        """Window, RTT and loss counters for this session (see also telemetry)."""
+        return {
+            'cwnd': self.congestion.cwnd if self.congestion else 1,
+            'ssthresh': self.congestion.ssthresh if self.congestion else None,
+            'rwnd': self.rwnd,
+            'in_flight': len(self._unacked),
+            'srtt': self.rtt.srtt,
+            'rto': self.rtt.rto,
+            'rtt_samples': self.rtt.samples,
+            'loss_events': self.loss_events,
+            'timeouts': self.timeouts,
+            'packets_sent': self.telemetry.packets_sent,
+            'retransmissions': self.telemetry.total_retransmissions,
+            'fast_retransmits': self.fast_retransmits,
+            'naks_received': self.telemetry.events.get('naks_received', 0),
+        }
+
+    def _window(self):
+        limit = min(self.max_window, self.rwnd)
+        if self.congestion is not None:
+            limit = min(limit, self.congestion.window)
+        return limit
+
+    def _pipe(self):
+        """Segments believed to be in the network (excludes ones deemed lost)."""
+        lost = max(0, self._recover - max(self._retx_next, self.base))
+        return self.next_seq - self.base - lost
+
+    def _can_send(self):
+        # with nothing in flight, one segment may always go out; when the
+        # receiver window is closed it doubles as the zero-window probe
+        pipe = self._pipe()
+        return pipe < self._window() or pipe == 0
+
+    def _enqueue(self, seg_type, payload):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((seg_type, payload, future))
+        self._pump()
+        return future
+
+    def _pump(self):
+        """Resend segments deemed lost, then admit new ones, within the window."""
+        while self._retx_next < self._recover and self._can_send():
+            if self._retx_next in self._unacked:
+                self._retransmit(self._retx_next, RETX_TIMEOUT)
+            self._retx_next += 1
+        while self._queue and self._can_send():
+            seg_type, payload, future = self._queue.popleft()
+            segment = make_segment(seg_type, self.conn_id, self.next_seq,
+                                   payload)
+            loop_time = asyncio.get_running_loop().time()
+            # [segment, last sent, retransmitted, first sent]
+            self._unacked[self.next_seq] = [segment, 0.0, False, loop_time]
+            self._transmit(self.next_seq)
+            self.next_seq += 1
+            if not future.done():
+                future.set_result(None)
+        if self._unacked and self._timer is None:
+            self._start_timer()
+
+    def _transmit(self, seq_num):
+        entry = self._unacked[seq_num]
+        self.endpoint.transport.sendto(entry[0], self.peer)
+        entry[1] = asyncio.get_running_loop().time()
+        self.telemetry.packets_sent += 1
+        if self.endpoint.trace >= TRACE_PACKETS:
+            print(f"[SEND] conn {self.conn_id} seq #{seq_num}"
+                  + (" (retransmission)" if entry[2] else ""))
+
+    def _retransmit(self, seq_num, cause):
+        self._unacked[seq_num][2] = True
+        self.telemetry.retransmit(cause)
+        self._transmit(seq_num)
+
+    def _start_timer(self):
+        self._cancel_timer()
+        self._timer = asyncio.get_running_loop().call_later(
+            self.rtt.rto, self._on_timeout)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timeout(self):
+        self._timer = None
+        if self.base not in self._unacked:
+            return
+        self._retries += 1
+        if self.max_retries and self._retries > self.max_retries:
+            self._fail(ConnectionError(
+                'session {}: no ACK from {}:{} after {} retransmissions'
+                .format(self.conn_id, self.peer[0], self.peer[1],
+                        self.max_retries)))
+            return
+        if self.rwnd > 0:
+            self.timeouts += 1
+            self.loss_events += 1
+            if self.congestion is not None:
+                self.congestion.on_timeout()
+            self.rtt.backoff()
+        # else this was a zero-window probe going unanswered: no loss, so the
+        # RTO is not backed off and the next probe goes out on schedule
+        # everything in flight is presumed lost and resent as the window opens
+        self._recover = self.next_seq
+        self._retx_next = self.base
+        self._pump()
+        self._start_timer()
+
+    def _fast_retransmit(self, seq_num, cause):
+        """Resend a segment reported lost unless it was sent within the last RTT."""
+        entry = self._unacked.get(seq_num)
+        if entry is None:
+            return
+        now = asyncio.get_running_loop().time()
+        if entry[2] and now - entry[1] < (self.rtt.srtt or self.rtt.rto):
+            return
+        if self.base >= self._fast_recover:
+            # first loss of this window: halve once, not once per segment
+            self.loss_events += 1
+            if self.congestion is not None:
+                self.congestion.on_fast_loss()
+            self._fast_recover = self.next_seq
+        self.fast_retransmits += 1
+        self._retransmit(seq_num, cause)
+
+    def _on_ack(self, ack_num, window, missing=None):
+        # only an ACK that advances base is known to be newer than the one
+        # our window came from; a stale or reordered ACK could shrink or
+        # reopen it wrongly. The exceptions are window updates for the
+        # current base with nothing in flight, which cannot be stale, and
+        # while the window is closed, when the update is what we wait for.
+        self.telemetry.acks_received += 1
+        self._retries = 0
+        reopened = False
+        if self.base < ack_num <= self.next_seq or (
+                ack_num == self.base and (not self._unacked or self.rwnd == 0)):
+            reopened = ack_num == self.base and self.rwnd == 0 and window > 0
+            self.rwnd = window
+        if self.base < ack_num <= self.next_seq:
+            now = asyncio.get_running_loop().time()
+            rtt_sample = None
+            for seq_num in range(self.base, ack_num):
+                segment, sent_at, retransmitted, first_sent = \
+                    self._unacked.pop(seq_num)
+                if not retransmitted:
+                    rtt_sample = now - sent_at
+                if segment[10] == TYPE_DATA:
+                    self.telemetry.latency.add(now - first_sent)
+                    self.telemetry.deliver(len(segment) - SEGMENT_HEADER_LEN)
+            if rtt_sample is not None:
+                self.rtt.sample(rtt_sample)
+                self.telemetry.rtt.add(rtt_sample)
+            if self.congestion is not None:
+                self.congestion.on_ack(ack_num - self.base)
+            self.base = ack_num
+            self._retx_next = max(self._retx_next, ack_num)
+            self._dup_acks = 0
+            if self._unacked:
+                self._start_timer()
+            else:
+                self._cancel_timer()
+            if ack_num < self._fast_recover and missing is None:
+                # partial ACK during recovery: the next hole is lost too
+                self._fast_retransmit(ack_num, RETX_PARTIAL_ACK)
+        elif (ack_num == self.base and self._unacked and missing is None
+              and window > 0 and not reopened):
+            # an answer to a zero-window probe or a window update is not a
+            # sign of loss
+            self._dup_acks += 1
+            self.telemetry.duplicates += 1
+            if self._dup_acks == min(DUP_ACK_THRESHOLD, self.max_window):
+                self._fast_retransmit(self.base, RETX_DUP_ACK)
+        if missing:
+            self.telemetry.count('naks_received')
+            for seq_num in missing:
+                self._fast_retransmit(seq_num, RETX_NAK)
+        if reopened and self.base in self._unacked:
+            # the full receiver dropped our probe; resend it now rather than
+            # on the probe timer
+            self._retransmit(self.base, RETX_WINDOW_OPEN)
+            self._start_timer()
+        self._pump()
+        if not self._queue and not self._unacked:
+            for future in self._drain_waiters:
+                if not future.done():
+                    future.set_result(None)
+            self._drain_waiters.clear()
+
+    def _on_reset(self):
+        # before base moves the receiver may simply not have seen seq 0 yet
+        # (it was lost and later segments got through), so the timer resends it
+        if self.base == 0:
+            return
+        self.telemetry.count('resets')
+        self._fail(ConnectionError(
+            'session {} was reset by the receiver'.format(self.conn_id)))
+
+    def _fail(self, exc):
+        """Abort the session and release it from the endpoint."""
+        self._abort(exc)
+        self.endpoint._forget(self)
+
+    def _abort(self, exc):
+        """Fail every pending send; used when the endpoint shuts down."""
+        self._cancel_timer()
+        pending = [future for _, _, future in self._queue]
+        pending += self._drain_waiters
+        for future in pending:
+            if not future.done():
+                future.set_exception(exc)
+        self._queue.clear()
+        self._unacked.clear()
+        self._drain_waiters.clear()
+        self.closed = True
+
+
+class ReceiverSession:
+    """
+    The receiving half of one reliable session.
+
+    Segments inside the receive window are buffered until they can be
+    delivered in order. Every segment is answered with a cumulative ACK naming
+    the next expected sequence number and the free space in the window, so
+    duplicates are never delivered twice and senders cannot overrun a slow
+    reader. With nak=True, an ACK sent while segments are buffered out of
+    order becomes a NAK listing the holes below the highest buffered segment.
+    """
+    def __init__(self, endpoint, peer, conn_id, window=None, nak=False):
+        self.endpoint = endpoint
+        self.peer = peer
+        self.conn_id = conn_id
+        self.capacity = window or DEFAULT_RECV_WINDOW
+        self.nak = nak
+        self.expected_seq = 0
+        self.closed = False
+        self.last_active = asyncio.get_running_loop().time()
+        self.telemetry = ConnectionStats(
+            'receiver conn {} <- {}:{}'.format(conn_id, *peer[:2]))
+        self._buffer = {}
+        self._window_closed = False
+        self._messages = asyncio.Queue()
+
+    async def recv(self):
+        """
+        Wait for the next delivered message.
+
+        Returns:
+            bytes: the payload, or None once the peer has closed the session.
+        """
+        payload = await self._messages.get()
+        if self._window_closed and self.advertised_window() > 0:
+            self._ack()
+        return payload
+
+    def advertised_window(self):
+        """Segments accepted beyond the last cumulative ACK (unread ones count)."""
+        return max(0, self.capacity - self._messages.qsize())
+
+    def _on_segment(self, seg_type, seq_num, payload):
+        self.telemetry.packets_received += 1
+        if seq_num < self.expected_seq or seq_num in self._buffer:
+            self.telemetry.duplicates += 1
+        elif seq_num < self.expected_seq + self.advertised_window():
+            self._buffer[seq_num] = (seg_type, payload)
+            while self.expected_seq in self._buffer and not self.closed:
+                self._deliver(*self._buffer.pop(self.expected_seq))
+        self._ack()
+
+    def _deliver(self, seg_type, payload):
+        self.expected_seq += 1
+        if seg_type == TYPE_FIN:
+            self.closed = True
+            self._buffer.clear()
+            self._messages.put_nowait(None)
+        else:
+            self.telemetry.deliver(len(payload))
+            self.endpoint._deliver(self, payload)
+
+    def _missing(self):
+        """Sequence numbers absent below the highest buffered one."""
+        missing = []
+        for seq_num in range(self.expected_seq, max(self._buffer)):
+            if seq_num not in self._buffer:
+                missing.append(seq_num)
+                if len(missing) == MAX_NAK_ENTRIES:
+                    break
+        return missing
+
+    def _ack(self):
+        window = self.advertised_window()
+        self._window_closed = window == 0
+        missing = self._missing() if self.nak and self._buffer else None
+        self.telemetry.acks_sent += 1
+        if missing:
+            self.telemetry.count('naks_sent')
+        self.endpoint._send_ack(self.peer, self.conn_id, self.expected_seq,
+                                window, missing)
+
+
+class SenderEndpoint(asyncio.DatagramProtocol):
+    """
+    One UDP socket shared by any number of SenderSessions.
+
+    ACKs are routed to their session by connection id; an ACK whose source
+    address does not match the session's peer is ignored. Closed sessions are
+    folded into self.totals; close() dumps all stats at TRACE_EVENTS and
+    above, and TRACE_PACKETS prints one line per segment sent.
+    """
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_window=1, trace=TRACE_OFF,
+                 max_retries=DEFAULT_MAX_RETRIES):
+        self.timeout = timeout
+        self.max_window = max_window
+        self.max_retries = max_retries
+        self.trace = trace
+        self.transport = None
+        self.sessions = {}
+        self.totals = ConnectionStats('sender endpoint totals')
+        self._next_conn_id = 1
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connect(self, peer, max_window=None):
+        """
+        Open a new session to a receiver.
+
+        Args:
+            peer (tuple): the receiver's (host, port).
+            max_window (int): overrides the endpoint's window bound.
+
+        Returns:
+            SenderSession: the new session.
+        """
+        conn_id = self._allocate_conn_id()
+        session = SenderSession(self, peer, conn_id, self.timeout,
+                                max_window or self.max_window,
+                                self.max_retries)
+        self.sessions[conn_id] = session
+        return session
+
+    def _allocate_conn_id(self):
+        """Next nonzero 32-bit connection id not used by an open session."""
+        if len(self.sessions) >= 0xFFFFFFFF:
+            raise ConnectionError('no free connection ids')
+        while True:
+            conn_id = self._next_conn_id
+            self._next_conn_id = conn_id % 0xFFFFFFFF + 1
+            if conn_id not in self.sessions:
+                return conn_id
+
+    def datagram_received(self, data, addr):
+        segment = parse_segment(data)
+        if segment is None:
+            self.totals.checksum_failures += 1
+            return
+        seg_type, conn_id, ack_num, window, payload = segment
+        session = self.sessions.get(conn_id)
+        if session is None or session.peer != addr:
+            return
+        if seg_type == TYPE_ACK:
+            session._on_ack(ack_num, window)
+        elif seg_type == TYPE_NAK:
+            session._on_ack(ack_num, window, unpack_seq_list(payload))
+        elif seg_type == TYPE_RST:
+            session._on_reset()
+
+    def connection_lost(self, exc):
+        for session in list(self.sessions.values()):
+            session._abort(ConnectionError('sender endpoint closed'))
+        self.sessions.clear()
+
+    def dump_stats(self, out=None):
+        """Dump every open session's stats, then the endpoint totals."""
+        for session in self.sessions.values():
+            session.telemetry.dump(out)
+        self.totals.dump(out)
+
+    def close(self):
+        if self.trace >= TRACE_EVENTS:
+            self.dump_stats()
+        self.transport.close()
+
+    def _forget(self, session):
+        if self.sessions.pop(session.conn_id, None) is not None:
+            self.totals.merge(session.telemetry)
+
+
+class ReceiverEndpoint(asyncio.DatagramProtocol):
+    """
+    One UDP socket serving any number of ReceiverSessions.
+
+    Sessions are created on the first segment (seq 0) from a new
+    (address, connection id) pair and dropped once their FIN is delivered,
+    or once no segment has arrived for session_timeout seconds (the peer is
+    presumed gone; recv() then returns None as for a FIN). A later segment
+    for an unknown session, other than its seq 0, is answered with a reset
+    (TYPE_RST), which fails the sending session instead of leaving it to
+    retransmit into the void.
+
+    Like TCP's TIME_WAIT, a session closed by its FIN leaves its final
+    cumulative ACK behind for time_wait seconds. If the last ACKs were lost,
+    the sender is still retransmitting segments the session already
+    delivered, and every one of them is answered with that ACK.
+
+    Args:
+        on_data (callable): optional on_data(session, payload) callback; when
+            omitted, payloads are queued for ReceiverSession.recv().
+        on_session (callable): optional on_session(session) callback invoked
+            for every new session.
+        window (int): receive buffer per session, in segments.
+        nak (bool): send NAKs naming missing segments instead of plain
+            duplicate ACKs.
+        trace (int): TRACE_EVENTS dumps stats on close(); TRACE_PACKETS also
+            prints one line per segment received.
+        session_timeout (float): idle seconds before a session is expired
+            (0 or None: never).
+        time_wait (float): seconds a closed session's final ACK is kept
+            (0: not kept).
+    """
+    def __init__(self, on_data=None, on_session=None,
+                 window=DEFAULT_RECV_WINDOW, nak=False, trace=TRACE_OFF,
+                 session_timeout=DEFAULT_SESSION_TIMEOUT,
+                 time_wait=DEFAULT_TIME_WAIT):
+        self.on_data = on_data
+        self.on_session = on_session
+        self.window = window
+        self.nak = nak
+        self.trace = trace
+        self.session_timeout = session_timeout
+        self.time_wait = time_wait
+        self.transport = None
+        self.sessions = {}
+        self.closed_sessions = {}   # (addr, conn_id) -> (final ACK, closed at)
+        self.totals = ConnectionStats('receiver endpoint totals')
+        self._sweeper = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._schedule_sweep()
+
+    def connection_lost(self, exc):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def _schedule_sweep(self):
+        interval = min(filter(None, (self.session_timeout, self.time_wait)),
+                       default=None)
+        if interval:
+            self._sweeper = asyncio.get_running_loop().call_later(
+                interval / 2, self._sweep)
+
+    def _sweep(self):
+        self.expire_idle()
+        self._schedule_sweep()
+
+    def expire_idle(self, now=None):
+        """
+        Drop sessions that have been idle for session_timeout seconds, and
+        closed sessions' final ACKs older than time_wait seconds.
+
+        Args:
+            now (float): the event loop time to measure idleness against
+                (default: the running loop's time).
+
+        Returns:
+            int: the number of sessions expired.
+        """
+        if now is None:
+            now = asyncio.get_running_loop().time()
+        if self.time_wait:
+            for key, (_, closed_at) in list(self.closed_sessions.items()):
+                if now - closed_at < self.time_wait:
+                    break   # kept in the order the sessions closed
+                del self.closed_sessions[key]
+        if not self.session_timeout:
+            return 0
+        idle = [key for key, session in self.sessions.items()
+                if now - session.last_active >= self.session_timeout]
+        for key in idle:
+            session = self.sessions.pop(key)
+            session.closed = True
+            session._buffer.clear()
+            session._messages.put_nowait(None)
+            session.telemetry.count('expired')
+            self.totals.merge(session.telemetry)
+        return len(idle)
+
+    def datagram_received(self, data, addr):
+        segment = parse_segment(data)
+        if segment is None:
+            # corrupt: the conn id cannot be trusted, let the sender time out
+            self.totals.checksum_failures += 1
+            return
+        seg_type, conn_id, seq_num, _, payload = segment
+        if seg_type in (TYPE_ACK, TYPE_NAK, TYPE_RST):
+            return
+        if self.trace >= TRACE_PACKETS:
+            print(f"[RECV] conn {conn_id} from {addr[0]}:{addr[1]} "
+                  f"seq #{seq_num}")
+        key = (addr, conn_id)
+        session = self.sessions.get(key)
+        if session is None:
+            if key in self.closed_sessions:
+                # our final ACKs were lost and the sender is retransmitting
+                self._send_ack(addr, conn_id, self.closed_sessions[key][0],
+                               self.window)
+                return
+            if seg_type == TYPE_FIN:
+                # our ACK for an already-closed session was lost
+                self._send_ack(addr, conn_id, seq_num + 1, self.window)
+                return
+            if seq_num != 0:
+                # expired, or never seen: tell the sender to give up
+                self.totals.count('resets_sent')
+                self.transport.sendto(make_segment(TYPE_RST, conn_id, seq_num),
+                                      addr)
+                return
+            session = ReceiverSession(self, addr, conn_id, self.window,
+                                      self.nak)
+            self.sessions[key] = session
+            if self.on_session is not None:
+                self.on_session(session)
+        session.last_active = asyncio.get_running_loop().time()
+        session._on_segment(seg_type, seq_num, payload)
+        if session.closed:
+            del self.sessions[key]
+            if self.time_wait:
+                self.closed_sessions[key] = (session.expected_seq,
+                                             session.last_active)
+            self.totals.merge(session.telemetry)
+
+    def dump_stats(self, out=None):
+        """Dump every open session's stats, then the endpoint totals."""
+        for session in self.sessions.values():
+            session.telemetry.dump(out)
+        self.totals.dump(out)
+
+    def close(self):
+        if self.trace >= TRACE_EVENTS:
+            self.dump_stats()
+        self.transport.close()
+
+    def _deliver(self, session, payload):
+        if self.on_data is not None:
+            self.on_data(session, payload)
+        else:
+            session._messages.put_nowait(payload)
+
+    def _send_ack(self, peer, conn_id, ack_num, window, missing=None):
+        if missing:
+            segment = make_segment(TYPE_NAK, conn_id, ack_num,
+                                   pack_seq_list(missing), window)
+        else:
+            segment = make_segment(TYPE_ACK, conn_id, ack_num, window=window)
+        self.transport.sendto(segment, peer)
+
+
+async def open_receiver(host='localhost', port=10116, **kwargs):
+    """Bind a ReceiverEndpoint; keyword arguments go to its constructor."""
+    loop = asyncio.get_running_loop()
+    _, endpoint = await loop.create_datagram_endpoint(
+        lambda: ReceiverEndpoint(**kwargs), local_addr=(host, port))
+    return endpoint
+
+
+async def open_sender(host='localhost', port=0, **kwargs):
+    """Bind a SenderEndpoint on an ephemeral (or given) local port."""
+    loop = asyncio.get_running_loop()
+    _, endpoint = await loop.create_datagram_endpoint(
+        lambda: SenderEndpoint(**kwargs), local_addr=(host, port))
+    return endpoint
+
+
+async def _demo(num_sessions=200, num_messages=10, port=10116, max_window=1):
+    """Run num_sessions concurrent sessions against one local receiver."""
+    delivered = {}
+
+    def on_data(session, payload):
+        delivered[session.conn_id] = delivered.get(session.conn_id, 0) + 1
+
+    receiver = await open_receiver(port=port, on_data=on_data,
+                                   trace=TRACE_EVENTS)
+    sender = await open_sender(max_window=max_window)
+
+    async def run_session():
+        session = sender.connect(('127.0.0.1', port))
+        for i in range(1, num_messages + 1):
+            await session.send('msg' + str(i))
+        await session.close()
+
+    await asyncio.gather(*(run_session() for _ in range(num_sessions)))
+    sender.close()
+    receiver.close()
+    print(f"[DONE] {num_sessions} sessions, "
+          f"{sum(delivered.values())} messages delivered")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
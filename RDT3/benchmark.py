@@ -0,0 +1,219 @@
+"""
+@Purpose: Goodput benchmark matrix for the RDT 3.0 implementation.
+Starts a receiver and a sender locally, routes them through the impairment
+emulator and sweeps loss rate, RTT, payload size and protocol mode. Every run
+records goodput, retransmission ratio and completion time; results are
+written as CSV and/or JSON and can optionally be plotted (needs matplotlib).
+
+Usage:
+    python3 benchmark.py --loss 0,0.01,0.05 --rtt 0.01,0.05 --payload 512,1024
+                         --modes stop-and-wait,pipelined --csv results.csv
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import sys
+
+from async_rdt import open_receiver, open_sender
+from impairment import Impairment, open_impaired_path
+
+# protocol modes: sender window bound and whether the receiver sends NAKs
+MODES = {
+    'stop-and-wait': {'max_window': 1, 'nak': False},
+    'pipelined': {'max_window': 64, 'nak': False},
+    'pipelined-nak': {'max_window': 64, 'nak': True},
+}
+
+FIELDS = ['mode', 'loss', 'rtt', 'payload', 'messages', 'completed',
+          'completion_time', 'goodput', 'packets_sent', 'retransmissions',
+          'retransmission_ratio', 'timeouts', 'fast_retransmits']
+
+
+async def run_once(mode, loss, rtt, payload, messages, rate=None, seed=0,
+                   run_timeout=120.0):
+    """
+    Transfer `messages` messages of `payload` bytes over one impaired path.
+
+    Args:
+        mode (str): a key of MODES.
+        loss (float): loss probability applied in each direction.
+        rtt (float): round-trip propagation delay, in seconds.
+        payload (int): message size, in bytes.
+        messages (int): number of messages to send.
+        rate (float): forward bottleneck in bytes per second (None: unlimited).
+        seed (int): seed for the impairment's random generators.
+        run_timeout (float): give up on the run after this many seconds.
+
+    Returns:
+        dict: one result row with the keys in FIELDS.
+    """
+    settings = MODES[mode]
+    delivered = [0]
+
+    def on_data(session, data):
+        delivered[0] += len(data)
+
+    loop = asyncio.get_running_loop()
+    receiver = await open_receiver('127.0.0.1', 0, on_data=on_data,
+                                   nak=settings['nak'])
+    path = await open_impaired_path(
+        receiver.transport.get_extra_info('sockname'),
+        forward=Impairment(loss=loss, delay=rtt / 2, rate=rate, seed=seed),
+        reverse=Impairment(loss=loss, delay=rtt / 2, seed=seed + 1))
+    sender = await open_sender('127.0.0.1', max_window=settings['max_window'])
+    session = sender.connect(path.transport.get_extra_info('sockname'))
+
+    async def transfer():
+        data = b'x' * payload
+        for _ in range(messages):
+            await session.send(data)
+        await session.close()
+
+    start = loop.time()
+    try:
+        await asyncio.wait_for(transfer(), run_timeout)
+        completed = True
+    except asyncio.TimeoutError:
+        completed = False
+    elapsed = loop.time() - start
+    stats = session.stats()
+    sender.close()
+    path.close()
+    receiver.close()
+
+    sent = stats['packets_sent']
+    return {
+        'mode': mode,
+        'loss': loss,
+        'rtt': rtt,
+        'payload': payload,
+        'messages': messages,
+        'completed': completed,
+        'completion_time': round(elapsed, 4),
+        'goodput': round(delivered[0] / elapsed, 1) if elapsed > 0 else 0.0,
+        'packets_sent': sent,
+        'retransmissions': stats['retransmissions'],
+        'retransmission_ratio': round(stats['retransmissions'] / sent, 4)
+        if sent else 0.0,
+        'timeouts': stats['timeouts'],
+        'fast_retransmits': stats['fast_retransmits'],
+    }
+
+
+def run_matrix(modes, losses, rtts, payloads, messages, rate=None, seed=0,
+               run_timeout=120.0, verbose=True):
+    """Run every combination of the sweep parameters; returns the result rows."""
+    results = []
+    for mode, loss, rtt, payload in itertools.product(modes, losses, rtts,
+                                                      payloads):
+        row = asyncio.run(run_once(mode, loss, rtt, payload, messages, rate,
+                                   seed, run_timeout))
+        results.append(row)
+        if verbose:
+            print(f"[BENCH] {mode:<14} loss={loss:<5} rtt={rtt:<5} "
+                  f"payload={payload:<5} -> {row['goodput']:>10.1f} B/s, "
+                  f"retx {row['retransmission_ratio']:.3f}, "
+                  f"{row['completion_time']:.2f} s"
+                  + ('' if row['completed'] else ' (TIMED OUT)'))
+    return results
+
+
+def write_csv(results, out):
+    """Write result rows as CSV to a file path or an open text stream."""
+    if isinstance(out, str):
+        with open(out, 'w', newline='') as f:
+            write_csv(results, f)
+        return
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def write_json(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def plot(results, path):
+    """Goodput vs loss, one panel per payload size and one line per mode/RTT."""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[BENCH] matplotlib is not installed; skipping the plot")
+        return
+    payloads = sorted({row['payload'] for row in results})
+    fig, axes = plt.subplots(1, len(payloads), squeeze=False,
+                             figsize=(5 * len(payloads), 4))
+    for ax, payload in zip(axes[0], payloads):
+        rows = [row for row in results if row['payload'] == payload]
+        for mode, rtt in sorted({(row['mode'], row['rtt']) for row in rows}):
+            line = sorted((row['loss'], row['goodput']) for row in rows
+                          if row['mode'] == mode and row['rtt'] == rtt)
+            ax.plot([x for x, _ in line], [y for _, y in line], marker='o',
+                    label=f"{mode}, rtt={rtt}")
+        ax.set_title(f"payload {payload} B")
+        ax.set_xlabel('loss rate')
+        ax.set_ylabel('goodput (B/s)')
+        ax.legend(fontsize='small')
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"[BENCH] plot written to {path}")
+
+
+def _floats(text):
+    return [float(x) for x in text.split(',') if x]
+
+
+def _ints(text):
+    return [int(x) for x in text.split(',') if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help='comma-separated protocol modes')
+    parser.add_argument('--loss', type=_floats, default=[0.0, 0.01, 0.05])
+    parser.add_argument('--rtt', type=_floats, default=[0.01, 0.05],
+                        help='round-trip delays in seconds')
+    parser.add_argument('--payload', type=_ints, default=[512, 1024],
+                        help='message sizes in bytes')
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=None,
+                        help='bottleneck rate in bytes per second')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--run-timeout', type=float, default=120.0)
+    parser.add_argument('--csv', help='write results as CSV to this file')
+    parser.add_argument('--json', help='write results as JSON to this file')
+    parser.add_argument('--plot', help='write a goodput plot to this file')
+    args = parser.parse_args(argv)
+
+    modes = [m for m in args.modes.split(',') if m]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error('unknown mode(s): {} (choose from {})'.format(
+            ', '.join(unknown), ', '.join(MODES)))
+
+    results = run_matrix(modes, args.loss, args.rtt, args.payload,
+                         args.messages, args.rate, args.seed, args.run_timeout)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.json:
+        write_json(results, args.json)
+    if args.plot:
+        plot(results, args.plot)
+    if not (args.csv or args.json):
+        write_csv(results, sys.stdout)
+    return results
+
+
+if __name__ == "__main__":
+    main()
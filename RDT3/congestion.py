@@ -0,0 +1,97 @@
+"""
+@Purpose: Congestion control and RTT estimation for pipelined RDT 3.0 sessions.
+CongestionWindow implements TCP-Reno style AIMD with slow start, counted in
+whole segments. RttEstimator keeps the smoothed RTT and derives the
+retransmission timeout (RFC 6298), so timers follow the path instead of a
+fixed 2 s.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+
+INITIAL_WINDOW = 2          # segments
+INITIAL_SSTHRESH = 64       # segments
+MIN_RTO = 0.1               # seconds
+MAX_RTO = 60.0              # seconds
+
+
+class CongestionWindow:
+    """
+    AIMD congestion window with slow start.
+
+    Below ssthresh the window grows by one segment per ACKed segment (doubling
+    every RTT); above it by 1/cwnd per ACKed segment (one segment per RTT). A
+    timeout collapses the window to one segment; a loss signalled by the
+    receiver (see on_fast_loss) halves it.
+
+    Args:
+        max_window (int): hard upper bound on the window, in segments.
+    """
+    def __init__(self, max_window=INITIAL_SSTHRESH * 4):
+        self.max_window = max_window
+        self.cwnd = float(min(INITIAL_WINDOW, max_window))
+        self.ssthresh = float(INITIAL_SSTHRESH)
+        self.loss_events = 0
+        self.timeouts = 0
+
+    @property
+    def window(self):
+        """Current window in whole segments (always at least one)."""
+        return max(1, int(self.cwnd))
+
+    def on_ack(self, acked):
+        """Grow the window for `acked` newly acknowledged segments."""
+        for _ in range(acked):
+            if self.cwnd < self.ssthresh:
+                self.cwnd += 1.0
+            else:
+                self.cwnd += 1.0 / self.cwnd
+        self.cwnd = min(self.cwnd, float(self.max_window))
+
+    def on_timeout(self):
+        """Retransmission timeout: back to slow start from one segment."""
+        self.timeouts += 1
+        self.loss_events += 1
+        self.ssthresh = max(self.cwnd / 2.0, 2.0)
+        self.cwnd = 1.0
+
+    def on_fast_loss(self):
+        """Loss detected without a timeout: multiplicative decrease."""
+        self.loss_events += 1
+        self.ssthresh = max(self.cwnd / 2.0, 2.0)
+        self.cwnd = self.ssthresh
+
+
+class RttEstimator:
+    """
+    Smoothed RTT and retransmission timeout as in RFC 6298.
+
+    Only segments that were never retransmitted are sampled (Karn's rule);
+    the caller is responsible for that. Each timeout doubles the RTO until
+    the next valid sample.
+
+    Args:
+        initial_rto (float): timeout used before the first sample, in seconds.
+    """
+    def __init__(self, initial_rto=1.0):
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial_rto
+        self.samples = 0
+
+    def sample(self, rtt):
+        """Fold one RTT measurement (seconds) into the estimate."""
+        self.samples += 1
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(max(self.srtt + 4.0 * self.rttvar, MIN_RTO), MAX_RTO)
+
+    def backoff(self):
+        """Exponential backoff after a retransmission timeout."""
+        self.rto = min(self.rto * 2.0, MAX_RTO)
@@ -0,0 +1,185 @@
+"""
+@Purpose: UDP impairment emulator for exercising RDT 3.0 endpoints.
+ImpairedPath is an asyncio relay placed between senders and a receiver. Each
+direction applies its own Impairment: random loss and corruption, propagation
+delay with jitter, and an optional bottleneck rate with a drop-tail queue, so
+congestion and flow control can be tested on one machine.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import asyncio
+import random
+
+
+class Impairment:
+    """
+    One direction of an emulated link.
+
+    Args:
+        loss (float): probability that a datagram is dropped.
+        delay (float): one-way propagation delay, in seconds.
+        jitter (float): extra uniform random delay in [0, jitter] seconds;
+            non-zero jitter can reorder datagrams.
+        rate (float): bottleneck rate in bytes per second (None: unlimited).
+        queue_bytes (int): drop-tail queue in front of the bottleneck.
+        corrupt (float): probability that one byte of a datagram is flipped.
+        seed: seed for this direction's random generator.
+    """
+    def __init__(self, loss=0.0, delay=0.0, jitter=0.0, rate=None,
+                 queue_bytes=64 * 1024, corrupt=0.0, seed=None):
+        self.loss = loss
+        self.delay = delay
+        self.jitter = jitter
+        self.rate = rate
+        self.queue_bytes = queue_bytes
+        self.corrupt = corrupt
+        self.random = random.Random(seed)
+        self.forwarded = 0
+        self.lost = 0
+        self.queue_drops = 0
+        self.corrupted = 0
+        self._busy_until = 0.0
+
+    def schedule(self, now, size):
+        """
+        Decide the fate of one datagram.
+
+        Args:
+            now (float): current loop time.
+            size (int): datagram size in bytes.
+
+        Returns:
+            float: seconds until delivery, or None if the datagram is dropped.
+        """
+        if self.random.random() < self.loss:
+            self.lost += 1
+            return None
+        wait = 0.0
+        if self.rate:
+            start = max(now, self._busy_until)
+            if (start - now) * self.rate + size > self.queue_bytes:
+                self.queue_drops += 1
+                return None
+            self._busy_until = start + size / self.rate
+            wait = self._busy_until - now
+        self.forwarded += 1
+        return wait + self.delay + self.random.uniform(0.0, self.jitter)
+
+    def mangle(self, data):
+        """Flip one random byte with probability `corrupt`."""
+        if not data or self.random.random() >= self.corrupt:
+            return data
+        self.corrupted += 1
+        i = self.random.randrange(len(data))
+        return data[:i] + bytes([data[i] ^ 0xFF]) + data[i + 1:]
+
+    def stats(self):
+        return {
+            'forwarded': self.forwarded,
+            'lost': self.lost,
+            'queue_drops': self.queue_drops,
+            'corrupted': self.corrupted,
+        }
+
+
+class _Upstream(asyncio.DatagramProtocol):
+    """Relay socket for one client; carries its traffic to and from the target."""
+    def __init__(self, path, client):
+        self.path = path
+        self.client = client
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.path._relay(self.path.reverse, self.path.transport, data,
+                         self.client)
+
+
+class ImpairedPath(asyncio.DatagramProtocol):
+    """
+    Relay datagrams from clients to `target` through the forward impairment
+    and the replies back through the reverse one.
+
+    Every client gets its own upstream socket, so the target still sees
+    distinct peer addresses.
+
+    Args:
+        target (tuple): the (host, port) traffic is relayed to.
+        forward (Impairment): applied to client -> target datagrams.
+        reverse (Impairment): applied to target -> client datagrams.
+    """
+    def __init__(self, target, forward=None, reverse=None):
+        self.target = target
+        self.forward = forward or Impairment()
+        self.reverse = reverse or Impairment()
+        self.transport = None
+        self._upstreams = {}
+        self._pending = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        upstream = self._upstreams.get(addr)
+        if upstream is not None:
+            self._relay(self.forward, upstream.transport, data, self.target)
+        elif addr in self._pending:
+            self._pending[addr].append(data)
+        else:
+            self._pending[addr] = [data]
+            asyncio.get_running_loop().create_task(self._open_upstream(addr))
+
+    async def _open_upstream(self, client):
+        loop = asyncio.get_running_loop()
+        _, upstream = await loop.create_datagram_endpoint(
+            lambda: _Upstream(self, client), remote_addr=self.target)
+        self._upstreams[client] = upstream
+        for data in self._pending.pop(client):
+            self._relay(self.forward, upstream.transport, data, self.target)
+
+    def _relay(self, impairment, transport, data, dest):
+        loop = asyncio.get_running_loop()
+        wait = impairment.schedule(loop.time(), len(data))
+        if wait is None:
+            return
+        data = impairment.mangle(data)
+        if transport.get_extra_info('peername') is not None:
+            dest = None
+        if wait <= 0.0:
+            self._send(transport, data, dest)
+        else:
+            loop.call_later(wait, self._send, transport, data, dest)
+
+    @staticmethod
+    def _send(transport, data, dest):
+        if not transport.is_closing():
+            transport.sendto(data, dest)
+
+    def stats(self):
+        return {'forward': self.forward.stats(), 'reverse': self.reverse.stats()}
+
+    def close(self):
+        for upstream in self._upstreams.values():
+            upstream.transport.close()
+        self._upstreams.clear()
+        self.transport.close()
+
+
+async def open_impaired_path(target, host='127.0.0.1', port=0, forward=None,
+                             reverse=None):
+    """
+    Start an ImpairedPath listening on (host, port) and relaying to target.
+
+    Returns:
+        ImpairedPath: the running relay; its transport's sockname is the
+        address senders should use instead of the receiver's.
+    """
+    loop = asyncio.get_running_loop()
+    _, path = await loop.create_datagram_endpoint(
+        lambda: ImpairedPath(target, forward, reverse), local_addr=(host, port))
+    return path
@@ -1,6 +1,7 @@
 from socket import *
 from time import sleep
-from util import create_checksum, verify_checksum
+from util import (create_checksum, verify_checksum, make_packet, NAK_DATA,
+                  ConnectionStats, now, TRACE_EVENTS, TRACE_PACKETS)
 
 """
 @Purpose: Receiver implementation for RDT 3.0 using UDP.
@@ -23,68 +24,120 @@ class Receiver:
     The Receiver class listens for incoming packets, validates checksums,
     simulates packet loss and corruption, handles duplicates, and sends back
     appropriate ACK packets based on sequence number.
+
+    With nak=True a damaged packet is answered with a NAK naming the expected
+    sequence number instead of a duplicate ACK for the previous one.
+
+    Counters live in self.stats and are dumped on close(); per-packet lines
+    are only printed at trace level TRACE_PACKETS.
     """
-    def __init__(self, host='localhost', port=10116):
+    def __init__(self, host='localhost', port=10116, nak=False,
+                 trace=TRACE_EVENTS):
         """Initialize the receiver with a UDP socket and default state."""
         self.socket = socket(AF_INET, SOCK_DGRAM)
         self.socket.bind((host, port))
         self.expected_seq = 0
         self.received_count = 0
-        print(f"[INIT] Receiver listening on {host}:{port}\n")
+        self.nak = nak
+        self.trace = trace
+        self.stats = ConnectionStats(f"receiver@{host}:{port}")
+        self._last_delivery = None
+        if trace >= TRACE_EVENTS:
+            print(f"[INIT] Receiver listening on {host}:{port}\n")
 
     def start(self):
         """Begin receiving packets using rdt3.0 logic."""
+        packets = self.trace >= TRACE_PACKETS
         try:
             while True:
                 packet, sender_addr = self.socket.recvfrom(2048)
                 self.received_count += 1
-                print(f"[RECV] Packet #{self.received_count} received")
+                self.stats.packets_received += 1
+                if packets:
+                    print(f"[RECV] Packet #{self.received_count} received")
 
                 # Simulate timeout every 6th packet
                 if self.received_count % 6 == 0:
-                    print(f"[SIMULATION] Timeout triggered (packet #{self.received_count})")
+                    self.stats.count('simulated_timeout')
+                    if packets:
+                        print(f"[SIMULATION] Timeout triggered (packet #{self.received_count})")
                     sleep(2)
                     continue
 
                 # Simulate corruption every 3rd packet (not 6th)
                 if self.received_count % 3 == 0:
-                    print(f"[SIMULATION] Corruption simulated (packet #{self.received_count})")
-                    self._send_ack(sender_addr, 1 - self.expected_seq)
+                    self.stats.count('simulated_corruption')
+                    if packets:
+                        print(f"[SIMULATION] Corruption simulated (packet #{self.received_count})")
+                    self._reject(sender_addr)
                     continue
 
                 # Check checksum
                 if not verify_checksum(packet):
-                    print(f"[ERROR] Checksum failed (packet #{self.received_count})")
-                    self._send_ack(sender_addr, 1 - self.expected_seq)
+                    self.stats.checksum_failures += 1
+                    if packets:
+                        print(f"[ERROR] Checksum failed (packet #{self.received_count})")
+                    self._reject(sender_addr)
                     continue
 
                 # Sequence check
                 seq_num = self._extract_seq_num(packet)
                 if seq_num != self.expected_seq:
-                    print(f"[DUPLICATE] Unexpected seq #{seq_num}, expected #{self.expected_seq}")
+                    self.stats.duplicates += 1
+                    if packets:
+                        print(f"[DUPLICATE] Unexpected seq #{seq_num}, expected #{self.expected_seq}")
                     self._send_ack(sender_addr, 1 - self.expected_seq)
                     continue
 
                 # Deliver message
-                payload = packet[12:].decode()
-                print(f"[DELIVERED] Payload: {payload}")
+                payload = packet[12:]
+                self._record_delivery(len(payload))
+                if packets:
+                    print(f"[DELIVERED] Payload: {payload.decode()}")
                 self._send_ack(sender_addr, self.expected_seq)
                 self.expected_seq = 1 - self.expected_seq
 
         except KeyboardInterrupt:
-            print("\n[SHUTDOWN] Receiver interrupted by user.")
+            if self.trace >= TRACE_EVENTS:
+                print("\n[SHUTDOWN] Receiver interrupted by user.")
         finally:
             self.close()
 
+    def _record_delivery(self, payload_len):
+        """Count a delivered message and the gap since the previous one."""
+        delivered = now()
+        if self._last_delivery is not None:
+            self.stats.interarrival.add(delivered - self._last_delivery)
+        self._last_delivery = delivered
+        self.stats.deliver(payload_len)
+
     def _extract_seq_num(self, packet):
         """Extract sequence number from packet."""
         return packet[11] & 0x01
 
+    def _reject(self, sender_addr):
+        """Ask for the expected packet again: a NAK, or a duplicate ACK."""
+        if self.nak:
+            self._send_nak(sender_addr, self.expected_seq)
+        else:
+            self._send_ack(sender_addr, 1 - self.expected_seq)
+
     def _send_ack(self, sender_addr, seq_num):
         """Send an ACK packet."""
         ack_packet = self._build_ack_packet(seq_num)
         self.socket.sendto(ack_packet, sender_addr)
-        print(f"[ACK] Sent ACK for seq #{seq_num}\n")
+        self.stats.acks_sent += 1
+        if self.trace >= TRACE_PACKETS:
+            print(f"[ACK] Sent ACK for seq #{seq_num}\n")
+
+    def _send_nak(self, sender_addr, seq_num):
+        """Send a NAK naming the packet that must be resent."""
+        nak_packet = make_packet(NAK_DATA.decode(), 0, seq_num)
+        self.socket.sendto(nak_packet, sender_addr)
+        self.stats.acks_sent += 1
+        self.stats.count('naks_sent')
+        if self.trace >= TRACE_PACKETS:
+            print(f"[NAK] Sent NAK for seq #{seq_num}\n")
 
     def _build_ack_packet(self, seq_num):
         """Construct an ACK packet with the correct format."""
@@ -97,9 +150,11 @@ class Receiver:
         return header + checksum + flags_bytes
 
     def close(self):
-        """Close the socket."""
+        """Close the socket and dump the stats."""
         self.socket.close()
-        print("[CLOSED] Receiver socket closed.")
+        if self.trace >= TRACE_EVENTS:
+            print("[CLOSED] Receiver socket closed.")
+            self.stats.dump()
 
 
 if __name__ == "__main__":
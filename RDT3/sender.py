@@ -1,5 +1,8 @@
+import atexit
 from socket import *
 from util import *
+from stats import (ConnectionStats, now, TRACE_EVENTS, TRACE_PACKETS,
+                   RETX_TIMEOUT, RETX_DUP_ACK, RETX_NAK)
 
 """
 @Purpose: Sender implementation for RDT 3.0 using UDP.
@@ -14,6 +17,11 @@ ACK verification, and retransmissions over an unreliable UDP channel.
 @Version: 1.0
 """
 
+# A stop-and-wait receiver only re-ACKs the previous packet when something went
+# wrong, so a single duplicate ACK is enough to resend.
+DUP_ACK_THRESHOLD = 1
+
+
 class Sender:
     """
       Implements the sending side of RDT 3.0 over UDP sockets.
@@ -21,8 +29,12 @@ class Sender:
       The Sender class handles message packetization, sequence number management,
       timeout-based retransmissions, and ACK validation to simulate reliable
       communication over an unreliable transport.
+
+      Counters and timings are kept in self.stats (a ConnectionStats) and are
+      dumped when the sender is closed or the program exits. Per-packet lines
+      are only printed at trace level TRACE_PACKETS.
     """
-    def __init__(self):
+    def __init__(self, trace=TRACE_EVENTS):
         self.receiver_host = '127.0.0.1'
         self.receiver_port = 10116
         self.sender_socket = socket(AF_INET, SOCK_DGRAM)
@@ -31,12 +43,22 @@ class Sender:
         self.acknowledged = False
         self.data = None
         self.packet_number = 1
+        self.dup_acks = 0
+        self.trace = trace
+        self.stats = ConnectionStats('sender->{}:{}'.format(self.receiver_host, self.receiver_port))
+        self.closed = False
+        self._sent_at = None
+        self._first_sent_at = None
+        self._retransmitted = False
+        atexit.register(self.close)
     """
     Reliably send a single message to the receiver using RDT 3.0.
 
     Constructs a packet, sends it, and waits for a valid ACK. If a timeout occurs
-    or a corrupted/duplicate ACK is received, the message is resent. Successfully
-    received messages are acknowledged, and the sequence number is toggled.
+    the message is resent; a duplicate ACK (DUP_ACK_THRESHOLD of them) or a NAK
+    from the receiver resends it immediately instead of waiting for the timer.
+    Successfully received messages are acknowledged, and the sequence number is
+    toggled.
 
     Args:
         app_msg_str (str): The message to be sent in the packet's data field.
@@ -46,56 +68,113 @@ class Sender:
         #store message and reset ack 
         self.data = app_msg_str
         self.acknowledged = False
+        packets = self.trace >= TRACE_PACKETS
 
         #print oringal message being sent. 
 
-        print("original message string: {}".format(self.data))
         self.packet = make_packet(self.data, 0, self.seq_num)
-        print("packet created: {}".format(self.packet))
+        if packets:
+            print("original message string: {}".format(self.data))
+            print("packet created: {}".format(self.packet))
 
-        #loop until valid ack is recvd 
-        while not self.acknowledged:
-            self.sender_socket.sendto(self.packet, (self.receiver_host, self.receiver_port))
-            print("packet num.{} is successfully sent to the receiver.".format(self.packet_number))
+        self.sender_socket.settimeout(2)
+        self._retransmitted = False
+        self._transmit()
+        self._first_sent_at = self._sent_at
 
-            self.sender_socket.settimeout(2)
+        #loop until valid ack is recvd; every resend goes back to one recvfrom
+        while not self.acknowledged:
             try:
                 ack_packet, addr = self.sender_socket.recvfrom(1024)
             except timeout:
-                print("socket timeout! Resend!\n")
-                print("[timeout retransmission]: {}".format(self.data))
-                self.packet_number += 1
-                continue
-            #extract 16 bit flags 
-            flags = int.from_bytes(ack_packet[10:12], byteorder='big')
-            ack_flag = (flags >> 1) & 0x01
-            ack_seq = flags & 0x01
-            #check if ack vaid 
-            if verify_checksum(ack_packet) and ack_flag == 1 and ack_seq == self.seq_num:
-                print("packet is received correctly: seq num {} = ACK num {}. all done!\n".format(self.seq_num, self.seq_num))
-                self.seq_num = 1 - self.seq_num
-                self.acknowledged = True
-                #resend packet if ack not valid . 
-            else:
-                print("receiver acked the previous pkt, resend!\n")
-                print("[ACK-Previous retransmission]: {}".format(self.data))
-                self.packet_number += 1
-                self.sender_socket.sendto(self.packet, (self.receiver_host, self.receiver_port))
-                print("packet num.{} is successfully sent to the receiver.".format(self.packet_number))
-                try:
-                    ack_packet, addr = self.sender_socket.recvfrom(1024)
-                    flags = int.from_bytes(ack_packet[10:12], byteorder='big')
-                    ack_flag = (flags >> 1) & 0x01
-                    ack_seq = flags & 0x01
-                    if verify_checksum(ack_packet) and ack_flag == 1 and ack_seq == self.seq_num:
-                        print("packet is received correctly: seq num {} = ACK num {}. all done!\n".format(self.seq_num, self.seq_num))
-                        self.seq_num = 1 - self.seq_num
-                        self.acknowledged = True
-                except timeout:
+                if packets:
                     print("socket timeout! Resend!\n")
                     print("[timeout retransmission]: {}".format(self.data))
+                self._transmit(RETX_TIMEOUT)
+                continue
+            self.stats.packets_received += 1
 
-            self.packet_number += 1
+            #check if ack vaid 
+            parsed = self._parse_ack(ack_packet)
+            if parsed is None:
+                self.stats.checksum_failures += 1
+            else:
+                self.stats.acks_received += 1
+            if self._is_ack(ack_packet, self.seq_num):
+                if packets:
+                    print("packet is received correctly: seq num {} = ACK num {}. all done!\n".format(self.seq_num, self.seq_num))
+                self._on_acked()
+            elif self._is_nak(ack_packet, self.seq_num):
+                #receiver named this packet as damaged: resend right away
+                if packets:
+                    print("receiver sent NAK for seq num {}, resend!\n".format(self.seq_num))
+                    print("[NAK retransmission]: {}".format(self.data))
+                self._transmit(RETX_NAK)
+            else:
+                #duplicate (or corrupt) ACK: fast retransmit instead of waiting 2 s
+                self.dup_acks += 1
+                if parsed is not None:
+                    self.stats.duplicates += 1
+                if self.dup_acks >= DUP_ACK_THRESHOLD:
+                    if packets:
+                        print("receiver acked the previous pkt, resend!\n")
+                        print("[ACK-Previous retransmission]: {}".format(self.data))
+                    self._transmit(RETX_DUP_ACK)
+
+    def close(self):
+        """Close the socket and dump the stats (once; also runs at exit)."""
+        if self.closed:
+            return
+        self.closed = True
+        # drop the exit hook's reference so a closed sender can be freed
+        atexit.unregister(self.close)
+        self.sender_socket.close()
+        if self.trace >= TRACE_EVENTS:
+            self.stats.dump()
+
+    def _on_acked(self):
+        done = now()
+        if not self._retransmitted:
+            # Karn's rule: only unambiguous round trips are sampled
+            self.stats.rtt.add(done - self._sent_at)
+        self.stats.latency.add(done - self._first_sent_at)
+        self.stats.deliver(len(self.packet) - 12)
+        self.seq_num = 1 - self.seq_num
+        self.acknowledged = True
+
+    def _transmit(self, cause=None):
+        """Send (or resend) the current packet and reset the duplicate-ACK count.
+
+        Args:
+            cause (str): the RETX_* reason when this is a retransmission.
+        """
+        self.sender_socket.sendto(self.packet, (self.receiver_host, self.receiver_port))
+        self._sent_at = now()
+        self.stats.packets_sent += 1
+        if cause is not None:
+            self._retransmitted = True
+            self.stats.retransmit(cause)
+        if self.trace >= TRACE_PACKETS:
+            print("packet num.{} is successfully sent to the receiver.".format(self.packet_number))
+        self.packet_number += 1
+        self.dup_acks = 0
+
+    @staticmethod
+    def _parse_ack(ack_packet):
+        """Return (ack_flag, ack_seq) of a packet with a valid checksum, else None."""
+        if len(ack_packet) < 12 or not verify_checksum(ack_packet):
+            return None
+        #extract 16 bit flags 
+        flags = int.from_bytes(ack_packet[10:12], byteorder='big')
+        return (flags >> 1) & 0x01, flags & 0x01
+
+    def _is_ack(self, ack_packet, seq_num):
+        return self._parse_ack(ack_packet) == (1, seq_num)
+
+    def _is_nak(self, ack_packet, seq_num):
+        # a NAK has the ACK flag cleared (see NAK_DATA in util)
+        parsed = self._parse_ack(ack_packet)
+        return parsed == (0, seq_num) and ack_packet[12:] == NAK_DATA
 
 
 
@@ -0,0 +1,163 @@
+"""
+@Purpose: Per-connection telemetry for the RDT 3.0 senders and receivers.
+ConnectionStats collects packet counters, retransmissions by cause, checksum
+failures, duplicates, delivered bytes and timing histograms for one
+connection. It can be read as a dict or dumped as one JSON line, which
+replaces the per-packet print lines as the way to observe a run; those lines
+are now only printed at TRACE_PACKETS.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import json
+import sys
+import time
+from bisect import bisect_left
+
+# trace levels shared by Sender, Receiver and the asyncio endpoints
+TRACE_OFF = 0       # nothing but errors
+TRACE_EVENTS = 1    # start-up, shutdown and the stats dump
+TRACE_PACKETS = 2   # one line per packet sent, received or resent
+
+# retransmission causes
+RETX_TIMEOUT = 'timeout'
+RETX_DUP_ACK = 'dup_ack'
+RETX_NAK = 'nak'
+RETX_PARTIAL_ACK = 'partial_ack'
+RETX_WINDOW_OPEN = 'window_open'   # zero-window probe dropped by a full receiver
+
+# histogram bucket upper bounds in seconds: 100 us doubling up to ~105 s
+BUCKET_BOUNDS = [0.0001 * 2 ** i for i in range(21)]
+
+
+def now():
+    """Monotonic clock used for every timing sample."""
+    return time.perf_counter()
+
+
+class Histogram:
+    """
+    Log-scale histogram of durations in seconds.
+
+    Keeps count, sum, min and max exactly; individual samples are only kept
+    as bucket counts, so memory stays constant however long the run is.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        for attr, pick in (('min', min), ('max', max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        """Summary plus the non-empty buckets keyed by their upper bound."""
+        buckets = {}
+        for i, n in enumerate(self.buckets):
+            if n:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else 'inf'
+                buckets['le_{}'.format(bound)] = n
+        return {'count': self.count, 'mean': self.mean, 'min': self.min,
+                'max': self.max, 'buckets': buckets}
+
+
+class ConnectionStats:
+    """
+    Counters and timing histograms for one connection.
+
+    Args:
+        name (str): label used when the stats are dumped.
+    """
+    def __init__(self, name='connection'):
+        self.name = name
+        self.started = now()
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.acks_sent = 0
+        self.acks_received = 0
+        self.retransmissions = {}
+        self.checksum_failures = 0
+        self.duplicates = 0
+        self.delivered_bytes = 0
+        self.delivered_messages = 0
+        self.rtt = Histogram()
+        self.latency = Histogram()       # first send until acknowledged
+        self.interarrival = Histogram()  # gap between successive deliveries
+        self.events = {}
+
+    def retransmit(self, cause):
+        """Count one retransmission; cause is one of the RETX_* constants."""
+        self.retransmissions[cause] = self.retransmissions.get(cause, 0) + 1
+
+    def count(self, event):
+        """Count an event that has no dedicated counter (e.g. simulated loss)."""
+        self.events[event] = self.events.get(event, 0) + 1
+
+    def deliver(self, payload_len):
+        self.delivered_messages += 1
+        self.delivered_bytes += payload_len
+
+    @property
+    def total_retransmissions(self):
+        return sum(self.retransmissions.values())
+
+    def merge(self, other):
+        """Fold another connection's stats into this one (for endpoint totals)."""
+        for attr in ('packets_sent', 'packets_received', 'acks_sent',
+                     'acks_received', 'checksum_failures', 'duplicates',
+                     'delivered_bytes', 'delivered_messages'):
+            setattr(self, attr, getattr(self, attr) + getattr(other, attr))
+        for mine, theirs in ((self.retransmissions, other.retransmissions),
+                             (self.events, other.events)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+        self.rtt.merge(other.rtt)
+        self.latency.merge(other.latency)
+        self.interarrival.merge(other.interarrival)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'elapsed': now() - self.started,
+            'packets_sent': self.packets_sent,
+            'packets_received': self.packets_received,
+            'acks_sent': self.acks_sent,
+            'acks_received': self.acks_received,
+            'retransmissions': self.total_retransmissions,
+            'retransmissions_by_cause': dict(self.retransmissions),
+            'checksum_failures': self.checksum_failures,
+            'duplicates': self.duplicates,
+            'delivered_bytes': self.delivered_bytes,
+            'delivered_messages': self.delivered_messages,
+            'rtt': self.rtt.to_dict(),
+            'latency': self.latency.to_dict(),
+            'interarrival': self.interarrival.to_dict(),
+            'events': dict(self.events),
+        }
+
+    def dump(self, out=None):
+        """Write the stats as one JSON line (default: stderr)."""
+        out = out or sys.stderr
+        out.write(json.dumps(self.to_dict()) + '\n')
+        out.flush()
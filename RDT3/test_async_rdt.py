@@ -0,0 +1,299 @@
+"""
+@Purpose: Regression checks for the multi-session asyncio RDT endpoints.
+Run with python3 -m unittest (or pytest) from the RDT3 folder.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import asyncio
+import unittest
+
+from async_rdt import (ReceiverEndpoint, SenderEndpoint, open_receiver,
+                       open_sender)
+from util import (make_segment, parse_segment, pack_seq_list,
+                  unpack_seq_list, MAX_WINDOW, TYPE_ACK, TYPE_DATA, TYPE_FIN,
+                  TYPE_NAK)
+
+
+class FakeTransport:
+    """Records what an endpoint sends instead of touching a socket."""
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((data, addr))
+
+    def close(self):
+        pass
+
+
+class ConnIdTest(unittest.TestCase):
+    def test_skips_zero_and_ids_in_use(self):
+        endpoint = SenderEndpoint()
+        endpoint.transport = FakeTransport()
+        first = endpoint.connect(('127.0.0.1', 9))
+        endpoint._next_conn_id = 0xFFFFFFFF
+        last = endpoint.connect(('127.0.0.1', 9))
+        wrapped = endpoint.connect(('127.0.0.1', 9))
+        self.assertEqual(first.conn_id, 1)
+        self.assertEqual(last.conn_id, 0xFFFFFFFF)
+        self.assertEqual(wrapped.conn_id, 2)
+
+
+class WindowTest(unittest.IsolatedAsyncioTestCase):
+    def test_window_is_clamped_to_16_bits(self):
+        for window, sent in ((100000, MAX_WINDOW), (MAX_WINDOW, MAX_WINDOW),
+                             (64, 64), (-1, 0)):
+            segment = make_segment(TYPE_ACK, 1, 0, window=window)
+            self.assertEqual(parse_segment(segment)[3], sent)
+
+    async def test_stale_ack_does_not_change_rwnd(self):
+        endpoint = SenderEndpoint(max_window=8)
+        endpoint.transport = FakeTransport()
+        session = endpoint.connect(('127.0.0.1', 9))
+        await session.send('msg0')
+        await session.send('msg1')  # the initial congestion window is 2
+        session._on_ack(1, 10)
+        self.assertEqual(session.rwnd, 10)
+        session._on_ack(0, 0)       # reordered: older than base
+        self.assertEqual(session.rwnd, 10)
+        session._on_ack(1, 0)       # duplicate for base, data in flight
+        self.assertEqual(session.rwnd, 10)
+        session._on_ack(2, 3)
+        self.assertEqual(session.rwnd, 3)
+        session._on_ack(2, 6)       # window update, nothing in flight
+        self.assertEqual(session.rwnd, 6)
+        session._abort(ConnectionError('test over'))
+
+    async def test_window_reopen_resends_the_probe(self):
+        endpoint = SenderEndpoint(max_window=4)
+        endpoint.transport = FakeTransport()
+        session = endpoint.connect(('127.0.0.1', 9))
+        await session.send('msg0')
+        session._on_ack(1, 0)       # delivered, but the reader is behind
+        self.assertEqual(session.rwnd, 0)
+        await session.send('msg1')  # goes out alone as the probe
+        probes = len(endpoint.transport.sent)
+        rto = session.rtt.rto
+        session._on_timeout()       # probe unanswered: resent, no backoff
+        self.assertEqual(session.rtt.rto, rto)
+        session._on_ack(1, 0)       # probe dropped, window still closed
+        self.assertEqual(session.rwnd, 0)
+        self.assertEqual(session.fast_retransmits, 0)
+        session._on_ack(1, 4)       # the reader drained: resend right away
+        self.assertEqual(session.rwnd, 4)
+        self.assertEqual(len(endpoint.transport.sent), probes + 2)
+        self.assertEqual(parse_segment(endpoint.transport.sent[-1][0])[2], 1)
+        self.assertEqual(
+            session.telemetry.retransmissions.get('window_open'), 1)
+        session._abort(ConnectionError('test over'))
+
+
+async def in_flight(endpoint, count):
+    """A session on endpoint with `count` segments in flight."""
+    session = endpoint.connect(('127.0.0.1', 9))
+    session.congestion.cwnd = float(count)
+    for i in range(count):
+        await session.send('msg' + str(i))
+    return session
+
+
+def sent_seqs(endpoint):
+    return [parse_segment(data)[2] for data, _ in endpoint.transport.sent]
+
+
+class FastRetransmitTest(unittest.IsolatedAsyncioTestCase):
+    async def test_third_duplicate_ack_resends_base(self):
+        endpoint = SenderEndpoint(max_window=8)
+        endpoint.transport = FakeTransport()
+        session = await in_flight(endpoint, 4)
+        session._on_ack(1, 10)
+        session._on_ack(1, 10)
+        session._on_ack(1, 10)
+        self.assertEqual(session.fast_retransmits, 0)
+        session._on_ack(1, 10)      # third duplicate
+        self.assertEqual(session.fast_retransmits, 1)
+        self.assertEqual(sent_seqs(endpoint)[4:], [1])
+        self.assertEqual(session.telemetry.retransmissions, {'dup_ack': 1})
+        self.assertEqual(session.congestion.loss_events, 1)
+
+        # partial ACK: 1 arrived but 2 did not, so 2 is resent at once,
+        # without halving the window a second time
+        session._on_ack(2, 10)
+        self.assertEqual(sent_seqs(endpoint)[5:], [2])
+        self.assertEqual(session.telemetry.retransmissions,
+                         {'dup_ack': 1, 'partial_ack': 1})
+        self.assertEqual(session.congestion.loss_events, 1)
+        session._abort(ConnectionError('test over'))
+
+    async def test_nak_resends_the_listed_segments(self):
+        endpoint = SenderEndpoint(max_window=8)
+        endpoint.transport = FakeTransport()
+        session = await in_flight(endpoint, 4)
+        nak = make_segment(TYPE_NAK, session.conn_id, 1,
+                           pack_seq_list([1, 3]), 10)
+        endpoint.datagram_received(nak, session.peer)
+        self.assertEqual(session.base, 1)
+        self.assertEqual(sent_seqs(endpoint)[4:], [1, 3])
+        self.assertEqual(session.telemetry.retransmissions, {'nak': 2})
+        self.assertEqual(session.stats()['naks_received'], 1)
+        # from another address the NAK is ignored
+        endpoint.datagram_received(nak, ('127.0.0.1', 10))
+        self.assertEqual(len(endpoint.transport.sent), 6)
+        session._abort(ConnectionError('test over'))
+
+    async def test_receiver_naks_the_holes(self):
+        endpoint = ReceiverEndpoint(nak=True)
+        transport = FakeTransport()
+        endpoint.connection_made(transport)
+        addr = ('127.0.0.1', 4000)
+        for seq_num in (0, 2, 4):
+            endpoint.datagram_received(
+                make_segment(TYPE_DATA, 7, seq_num, b'x'), addr)
+        seg_type, _, ack_num, _, payload = parse_segment(transport.sent[-1][0])
+        self.assertEqual((seg_type, ack_num), (TYPE_NAK, 1))
+        self.assertEqual(unpack_seq_list(payload), [1, 3])
+        endpoint.connection_lost(None)
+
+    def test_seq_list_round_trip(self):
+        seqs = [0, 1, 0xFFFFFFFF]
+        self.assertEqual(unpack_seq_list(pack_seq_list(seqs)), seqs)
+        self.assertEqual(unpack_seq_list(pack_seq_list(seqs) + b'\x01'), seqs)
+
+
+class StatsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_stop_and_wait_counts_timeouts(self):
+        endpoint = SenderEndpoint(max_window=1)
+        endpoint.transport = FakeTransport()
+        session = endpoint.connect(('127.0.0.1', 9))
+        await session.send('msg0')
+        session._on_timeout()
+        session._on_timeout()
+        stats = session.stats()
+        self.assertEqual((stats['timeouts'], stats['loss_events'],
+                          stats['retransmissions']), (2, 2, 2))
+        session._abort(ConnectionError('test over'))
+
+
+class SessionExpiryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_idle_session_expires(self):
+        endpoint = ReceiverEndpoint(session_timeout=5.0)
+        endpoint.connection_made(FakeTransport())
+        addr = ('127.0.0.1', 4000)
+        sessions = []
+        endpoint.on_session = sessions.append
+        endpoint.datagram_received(make_segment(TYPE_DATA, 7, 0, b'hi'), addr)
+        self.assertEqual(len(endpoint.sessions), 1)
+
+        now = asyncio.get_running_loop().time()
+        self.assertEqual(endpoint.expire_idle(now + 1.0), 0)
+        self.assertEqual(endpoint.expire_idle(now + 10.0), 1)
+        self.assertEqual(endpoint.sessions, {})
+        self.assertEqual(endpoint.totals.events.get('expired'), 1)
+        self.assertEqual(await sessions[0].recv(), b'hi')
+        self.assertIsNone(await sessions[0].recv())
+        endpoint.connection_lost(None)
+
+    async def test_timeout_off_keeps_sessions(self):
+        endpoint = ReceiverEndpoint(session_timeout=0)
+        endpoint.connection_made(FakeTransport())
+        endpoint.datagram_received(make_segment(TYPE_DATA, 7, 0, b'hi'),
+                                   ('127.0.0.1', 4000))
+        self.assertEqual(endpoint.expire_idle(1e9), 0)
+        self.assertEqual(len(endpoint.sessions), 1)
+
+
+class ResetTest(unittest.IsolatedAsyncioTestCase):
+    async def test_paused_sender_is_reset_after_expiry(self):
+        receiver = await open_receiver('127.0.0.1', 0, session_timeout=0.2)
+        port = receiver.transport.get_extra_info('sockname')[1]
+        sender = await open_sender('127.0.0.1')
+        session = sender.connect(('127.0.0.1', port))
+        await session.send('before')
+        await session.flush()
+        await asyncio.sleep(0.5)    # long enough for the session to expire
+        self.assertEqual(receiver.sessions, {})
+        with self.assertRaises(ConnectionError):
+            await session.send('after')
+            await asyncio.wait_for(session.flush(), 5)
+        self.assertNotIn(session.conn_id, sender.sessions)
+        self.assertEqual(receiver.totals.events.get('resets_sent'), 1)
+        sender.close()
+        receiver.close()
+
+    async def test_reset_before_first_ack_is_ignored(self):
+        endpoint = SenderEndpoint()
+        endpoint.transport = FakeTransport()
+        session = endpoint.connect(('127.0.0.1', 9))
+        await session.send('msg0')
+        session._on_reset()         # seq 0 lost, seq 1 reached the receiver
+        self.assertFalse(session.closed)
+        session._abort(ConnectionError('test over'))
+
+    async def test_gives_up_after_max_retries(self):
+        endpoint = SenderEndpoint(timeout=0.01, max_retries=3)
+        endpoint.transport = FakeTransport()
+        session = endpoint.connect(('127.0.0.1', 9))
+        await session.send('msg0')
+        with self.assertRaises(ConnectionError):
+            await asyncio.wait_for(session.flush(), 5)
+        self.assertEqual(len(endpoint.transport.sent), 4)  # 1 + 3 retries
+        self.assertEqual(endpoint.sessions, {})
+
+
+class TimeWaitTest(unittest.IsolatedAsyncioTestCase):
+    async def test_closed_session_reacks_retransmissions(self):
+        endpoint = ReceiverEndpoint(time_wait=5.0)
+        transport = FakeTransport()
+        endpoint.connection_made(transport)
+        addr = ('127.0.0.1', 4000)
+        for seq_num in range(3):
+            endpoint.datagram_received(
+                make_segment(TYPE_DATA, 7, seq_num, b'x'), addr)
+        endpoint.datagram_received(make_segment(TYPE_FIN, 7, 3), addr)
+        self.assertEqual(endpoint.sessions, {})
+
+        # the ACKs for 2 and the FIN were lost: the sender resends seq 2
+        transport.sent.clear()
+        endpoint.datagram_received(make_segment(TYPE_DATA, 7, 2, b'x'), addr)
+        ack = parse_segment(transport.sent[-1][0])
+        self.assertEqual((ack[0], ack[1], ack[2]), (TYPE_ACK, 7, 4))
+        self.assertEqual(endpoint.sessions, {})
+
+        now = asyncio.get_running_loop().time()
+        endpoint.expire_idle(now + 10.0)
+        self.assertEqual(endpoint.closed_sessions, {})
+        endpoint.connection_lost(None)
+
+
+class LoopbackTest(unittest.IsolatedAsyncioTestCase):
+    async def test_sessions_deliver_in_order(self):
+        received = {}
+
+        def on_data(session, payload):
+            received.setdefault(session.conn_id, []).append(payload)
+
+        receiver = await open_receiver('127.0.0.1', 0, on_data=on_data)
+        port = receiver.transport.get_extra_info('sockname')[1]
+        sender = await open_sender('127.0.0.1', max_window=4)
+
+        async def run_session():
+            session = sender.connect(('127.0.0.1', port))
+            for i in range(20):
+                await session.send('msg' + str(i))
+            await session.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(*(run_session() for _ in range(5))), 10)
+        sender.close()
+        receiver.close()
+        expected = [('msg' + str(i)).encode() for i in range(20)]
+        self.assertEqual(len(received), 5)
+        for payloads in received.values():
+            self.assertEqual(payloads, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+@Purpose: Regression checks for the RDT 3.0 telemetry (stats.py) and the
+blocking Sender/Receiver that report it, including their NAKs.
+Run with python3 -m unittest (or pytest) from the RDT3 folder.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import gc
+import socket
+import unittest
+import weakref
+
+from receiver import Receiver
+from sender import Sender
+from stats import ConnectionStats, TRACE_OFF
+from util import make_packet, verify_checksum
+
+
+class SenderCloseTest(unittest.TestCase):
+    def test_closed_sender_is_freed(self):
+        sender = Sender(trace=TRACE_OFF)
+        ref = weakref.ref(sender)
+        sender.close()
+        del sender
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class ReceiverStatsTest(unittest.TestCase):
+    def test_deliveries_record_interarrival_not_latency(self):
+        receiver = Receiver(port=0, trace=TRACE_OFF)
+        try:
+            for _ in range(3):
+                receiver._record_delivery(10)
+        finally:
+            receiver.close()
+        stats = receiver.stats.to_dict()
+        self.assertEqual(stats['delivered_messages'], 3)
+        self.assertEqual(stats['interarrival']['count'], 2)
+        self.assertEqual(stats['latency']['count'], 0)
+
+
+class NakTest(unittest.TestCase):
+    def receive_nak(self, seq_num):
+        receiver = Receiver(port=0, nak=True, trace=TRACE_OFF)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as peer:
+            peer.bind(('127.0.0.1', 0))
+            peer.settimeout(5)
+            try:
+                receiver._send_nak(peer.getsockname(), seq_num)
+            finally:
+                receiver.close()
+            return peer.recvfrom(1024)[0]
+
+    def test_nak_is_never_read_as_an_ack(self):
+        sender = Sender(trace=TRACE_OFF)
+        try:
+            for seq_num in (0, 1):
+                nak = self.receive_nak(seq_num)
+                self.assertTrue(verify_checksum(nak))
+                self.assertTrue(sender._is_nak(nak, seq_num))
+                self.assertFalse(sender._is_nak(nak, 1 - seq_num))
+                self.assertFalse(sender._is_ack(nak, seq_num))
+                # the original sender's check: ACK flag and sequence bit
+                flags = int.from_bytes(nak[10:12], byteorder='big')
+                self.assertEqual((flags >> 1) & 0x01, 0)
+                ack = make_packet('', 1, seq_num)
+                self.assertTrue(sender._is_ack(ack, seq_num))
+                self.assertFalse(sender._is_nak(ack, seq_num))
+        finally:
+            sender.close()
+
+
+class MergeTest(unittest.TestCase):
+    def test_merge_adds_interarrival(self):
+        total, one = ConnectionStats('total'), ConnectionStats('one')
+        one.interarrival.add(0.5)
+        one.latency.add(0.25)
+        total.merge(one)
+        self.assertEqual(total.interarrival.count, 1)
+        self.assertEqual(total.latency.count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Parallel batch runs of the distance vector simulator.
+:Author: Randy Rizo
+:Version: s25
+
+Runs one simulation per (seed, link-change scenario) across a process pool
+and aggregates convergence statistics: simulated time until no packets are
+left in the medium, settling time after the last link change, convergence
+time summed over the link-change epochs, messages and bytes sent and events
+processed. Every epoch's tables are checked against the shortest-path oracle.
+Runs are silent (verbose=False).
+
+Usage:
+    python3 batch.py --seeds 200 --topology random:30 --change both
+    python3 batch.py --seeds 100 --topology random:50 --vary-topology \\
+                     --json results.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from distance_table import DEFAULT_BACKEND, available_backends
+from network_simulator import ENGINES, HORIZONS, NetworkSimulator
+from topology import Topology
+
+METRICS = ['end_time', 'settle_time', 'convergence_time',
+           'max_epoch_convergence_time', 'messages', 'bytes', 'events',
+           'wall_time']
+
+
+def run_one(job):
+    """
+    Run one simulation described by a job dict.
+
+    Args:
+        job (dict): seed, has_change, backend, options (NetworkSimulator
+            keyword options) and topology (a Topology.to_dict() dict, or None
+            for the built-in network).
+
+    Returns:
+        dict: the job's seed and scenario plus the values in METRICS.
+    """
+    topology = job['topology']
+    if topology is not None:
+        topology = Topology.from_dict(topology)
+    start = time.perf_counter()
+    sim = NetworkSimulator(topology, job['has_change'], 0, job['seed'],
+                           job['backend'], verbose=False, check=True,
+                           **job['options']).run()
+    summary = sim.summary()
+    return {
+        'seed': job['seed'],
+        'has_change': job['has_change'],
+        'nodes': sim.num_entities,
+        'end_time': sim.time,
+        'settle_time': sim.time - sim.last_change,
+        'convergence_time': summary['convergence_time'],
+        'max_epoch_convergence_time': summary['max_epoch_convergence_time'],
+        'messages': summary['messages'],
+        'bytes': summary['bytes'],
+        'events': sim.events,
+        'correct': summary['correct'],
+        'wall_time': time.perf_counter() - start,
+    }
+
+
+def make_jobs(seeds, scenarios, topology_spec='', vary_topology=False,
+              backend=DEFAULT_BACKEND, options=None):
+    """
+    One job per seed and link-change scenario.
+
+    Args:
+        seeds (iterable): simulator seeds.
+        scenarios (iterable): has_change values to run for every seed.
+        topology_spec (str): '' (built-in network), random:<nodes> or a file.
+        vary_topology (bool): with random:<nodes>, draw a new topology (and
+            link changes) from each seed instead of one from seed 0.
+        backend (str): distance table backend.
+        options (dict): routing options (engine, recompute, horizon,
+            hold_down, route_timeout, delta, refresh_every) for every
+            run.
+    """
+    fixed = None
+    if topology_spec.startswith('random:'):
+        nodes = int(topology_spec[len('random:'):])
+        if not vary_topology:
+            fixed = Topology.random(nodes, num_changes=2, seed=0).to_dict()
+    elif topology_spec:
+        fixed = Topology.load(topology_spec).to_dict()
+    jobs = []
+    for seed in seeds:
+        topology = fixed
+        if vary_topology and topology_spec.startswith('random:'):
+            topology = Topology.random(nodes, num_changes=2,
+                                       seed=seed).to_dict()
+        for has_change in scenarios:
+            jobs.append({'seed': seed, 'has_change': has_change,
+                         'topology': topology, 'backend': backend,
+                         'options': options or {}})
+    return jobs
+
+
+def run_batch(jobs, workers=None):
+    """Run the jobs across a process pool; results come back in job order."""
+    chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_one, jobs, chunksize=chunksize))
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summarize(results):
+    """Per scenario, the share of correct runs and count/mean/min/median/
+    p95/max of every metric."""
+    summary = {}
+    for has_change in sorted({row['has_change'] for row in results}):
+        rows = [row for row in results if row['has_change'] == has_change]
+        scenario = summary['change' if has_change else 'no_change'] = {
+            'runs': len(rows),
+            'correct': sum(bool(row['correct']) for row in rows) / len(rows)}
+        for metric in METRICS:
+            values = sorted(row[metric] for row in rows)
+            scenario[metric] = {
+                'mean': statistics.mean(values),
+                'min': values[0],
+                'median': statistics.median(values),
+                'p95': _percentile(values, 0.95),
+                'max': values[-1],
+            }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--seeds', type=int, default=100,
+                        help='number of seeds to run')
+    parser.add_argument('--first-seed', type=int, default=1)
+    parser.add_argument('--change', choices=['no', 'yes', 'both'],
+                        default='both', help='link-change scenarios to run')
+    parser.add_argument('--topology', default='',
+                        help='topology file or random:<nodes> '
+                             '(default: the built-in 4-node network)')
+    parser.add_argument('--vary-topology', action='store_true',
+                        help='with random:<nodes>, a new topology per seed')
+    parser.add_argument('--backend', default=DEFAULT_BACKEND,
+                        choices=available_backends())
+    parser.add_argument('--engine', default='dv', choices=ENGINES)
+    parser.add_argument('--recompute', action='store_true')
+    parser.add_argument('--horizon', default='off', choices=HORIZONS)
+    parser.add_argument('--hold-down', type=float, default=0.0)
+    parser.add_argument('--route-timeout', type=float, default=10.0)
+    parser.add_argument('--delta', action='store_true')
+    parser.add_argument('--refresh-every', type=float, default=100.0)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--json', help='write the runs and summary here')
+    args = parser.parse_args(argv)
+
+    scenarios = {'no': [False], 'yes': [True], 'both': [False, True]}
+    jobs = make_jobs(range(args.first_seed, args.first_seed + args.seeds),
+                     scenarios[args.change], args.topology,
+                     args.vary_topology, args.backend,
+                     {'engine': args.engine, 'recompute': args.recompute,
+                      'horizon': args.horizon, 'hold_down': args.hold_down,
+                      'route_timeout': args.route_timeout,
+                      'delta': args.delta,
+                      'refresh_every': args.refresh_every})
+    start = time.perf_counter()
+    results = run_batch(jobs, args.workers)
+    summary = summarize(results)
+    print('{} runs in {:.2f} s'.format(len(results),
+                                       time.perf_counter() - start),
+          file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'summary': summary, 'runs': results}, f, indent=2)
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Convergence benchmark for the routing simulator across topology sizes.
+:Author: Randy Rizo
+:Version: s25
+
+For every topology size and routing mode (the distance vector variants and
+link state), runs a batch of random topologies (each with its own link
+changes) in parallel and reports correctness against the shortest-path
+oracle, convergence time, control-plane messages and bytes, and wall-clock
+time. Results are printed as CSV or written as CSV/JSON.
+
+Usage:
+    python3 benchmark.py --sizes 10,50,100 --seeds 10 --csv results.csv
+    python3 benchmark.py --sizes 200 --modes recompute,poison --json out.json
+"""
+import argparse
+import csv
+import json
+import statistics
+import sys
+
+from batch import make_jobs, run_batch
+
+# routing modes: NetworkSimulator options
+MODES = {
+    'legacy': {},
+    'recompute': {'recompute': True},
+    'split': {'horizon': 'split'},
+    'poison': {'horizon': 'poison'},
+    'poison-hold': {'horizon': 'poison', 'hold_down': 5.0},
+    'recompute-delta': {'recompute': True, 'delta': True},
+    'poison-delta': {'horizon': 'poison', 'delta': True},
+    'link-state': {'engine': 'ls'},
+}
+
+FIELDS = ['mode', 'nodes', 'runs', 'correct', 'convergence_time',
+          'convergence_time_p95', 'messages', 'messages_per_node', 'bytes',
+          'wall_time']
+
+
+def run_size(mode, nodes, seeds, workers=None):
+    """
+    Run `seeds` random topologies of `nodes` nodes with link changes.
+
+    Returns:
+        dict: one result row with the keys in FIELDS.
+    """
+    jobs = make_jobs(seeds, [True], 'random:{}'.format(nodes),
+                     vary_topology=True, options=MODES[mode])
+    runs = run_batch(jobs, workers)
+    convergence = sorted(run['convergence_time'] for run in runs)
+    messages = statistics.mean(run['messages'] for run in runs)
+    return {
+        'mode': mode,
+        'nodes': nodes,
+        'runs': len(runs),
+        'correct': sum(bool(run['correct']) for run in runs) / len(runs),
+        'convergence_time': round(statistics.mean(convergence), 3),
+        'convergence_time_p95': round(
+            convergence[min(len(convergence) - 1,
+                            int(0.95 * len(convergence)))], 3),
+        'messages': round(messages, 1),
+        'messages_per_node': round(messages / nodes, 1),
+        'bytes': round(statistics.mean(run['bytes'] for run in runs), 1),
+        'wall_time': round(statistics.mean(run['wall_time'] for run in runs),
+                           4),
+    }
+
+
+def run_suite(modes, sizes, seeds, workers=None, verbose=True):
+    """Every (size, mode) combination; returns the result rows."""
+    results = []
+    for nodes in sizes:
+        for mode in modes:
+            row = run_size(mode, nodes, seeds, workers)
+            results.append(row)
+            if verbose:
+                print('[BENCH] {:<15} nodes={:<5} correct={:.2f} '
+                      'convergence={:>8.2f} messages={:>10.1f} '
+                      'wall={:.3f} s'.format(
+                          mode, nodes, row['correct'],
+                          row['convergence_time'], row['messages'],
+                          row['wall_time']), file=sys.stderr)
+    return results
+
+
+def write_csv(results, out):
+    """Write result rows as CSV to a file path or an open text stream."""
+    if isinstance(out, str):
+        with open(out, 'w', newline='') as f:
+            write_csv(results, f)
+        return
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def _ints(text):
+    return [int(x) for x in text.split(',') if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help='comma-separated routing modes')
+    parser.add_argument('--sizes', type=_ints, default=[10, 50, 100],
+                        help='comma-separated topology sizes')
+    parser.add_argument('--seeds', type=int, default=10,
+                        help='random topologies per size and mode')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--csv', help='write results as CSV to this file')
+    parser.add_argument('--json', help='write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    modes = [m for m in args.modes.split(',') if m]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error('unknown mode(s): {} (choose from {})'.format(
+            ', '.join(unknown), ', '.join(MODES)))
+
+    results = run_suite(modes, args.sizes, range(1, args.seeds + 1),
+                        args.workers)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if not (args.csv or args.json):
+        write_csv(results, sys.stdout)
+    return results
+
+
+if __name__ == '__main__':
+    main()
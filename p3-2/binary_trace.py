@@ -0,0 +1,203 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Binary event traces for the distance vector simulator, and a replay tool.
+:Author: Randy Rizo
+:Version: s25
+
+A TraceWriter records a run as fixed-layout little-endian records through a
+large write buffer, so recording costs a struct.pack per event instead of the
+text formatting of the trace levels. A trace holds:
+
+  - DELIVER  a packet delivered to a node (time, src, dest)
+  - CHANGE   a link-cost change (time, u, v, new cost)
+  - SEND     a packet handed to to_layer_2 (send time, src, dest, arrival)
+  - ROW      a node's own distance vector, recorded whenever it changes
+             (time, node, N costs)
+
+TraceReader reads it back, and table_at() rebuilds every node's vector at any
+simulated time. From the command line:
+
+    python3 binary_trace.py run.dvt summary
+    python3 binary_trace.py run.dvt events --node 3 --start 10000 --end 10100
+    python3 binary_trace.py run.dvt table --at 15000
+"""
+import argparse
+import struct
+from array import array
+
+MAGIC = b'DVTR'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')        # magic, version, number of nodes
+
+DELIVER = 1
+CHANGE = 2
+SEND = 3
+ROW = 4
+KIND_NAMES = {DELIVER: 'deliver', CHANGE: 'change', SEND: 'send', ROW: 'row'}
+
+# every record starts with its kind and the simulated time
+_DELIVER = struct.Struct('<BdII')      # src, dest
+_CHANGE = struct.Struct('<BdIId')      # u, v, cost
+_SEND = struct.Struct('<BdIId')        # src, dest, arrival
+_ROW = struct.Struct('<BdI')           # node, then N doubles
+_KIND = struct.Struct('<B')
+_LAYOUTS = {DELIVER: _DELIVER, CHANGE: _CHANGE, SEND: _SEND, ROW: _ROW}
+
+BUFFER_SIZE = 1 << 20
+
+
+class TraceWriter(object):
+    """
+    Append-only binary trace of one simulation.
+
+    Args:
+        path (str): file to write (truncated).
+        num_nodes (int): number of nodes in the topology.
+        buffer_size (int): bytes buffered before each write to the file.
+    """
+
+    def __init__(self, path, num_nodes, buffer_size=BUFFER_SIZE):
+        self.num_nodes = num_nodes
+        self.records = 0
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._file.write(HEADER.pack(MAGIC, VERSION, num_nodes))
+        self._last_rows = {}
+
+    def deliver(self, time, src, dest):
+        self._file.write(_DELIVER.pack(DELIVER, time, src, dest))
+        self.records += 1
+
+    def change(self, time, u, v, cost):
+        self._file.write(_CHANGE.pack(CHANGE, time, u, v, cost))
+        self.records += 1
+
+    def send(self, time, src, dest, arrival):
+        self._file.write(_SEND.pack(SEND, time, src, dest, arrival))
+        self.records += 1
+
+    def row(self, time, node, costs):
+        """Record node's vector, unless it equals the last one recorded."""
+        data = array('d', costs).tobytes()
+        if self._last_rows.get(node) == data:
+            return
+        self._last_rows[node] = data
+        self._file.write(_ROW.pack(ROW, time, node))
+        self._file.write(data)
+        self.records += 1
+
+    def close(self):
+        self._file.close()
+
+
+class TraceReader(object):
+    """Reads a trace written by TraceWriter; iterate it for the records.
+
+    Records are tuples starting with (kind, time): (DELIVER, time, src, dest),
+    (CHANGE, time, u, v, cost), (SEND, time, src, dest, arrival) and
+    (ROW, time, node, costs) with costs a list of N floats.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._data = f.read()
+        magic, version, self.num_nodes = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not a version {} DV trace'.format(
+                path, VERSION))
+
+    def __iter__(self):
+        data = self._data
+        offset = HEADER.size
+        row_bytes = 8 * self.num_nodes
+        while offset < len(data):
+            kind = _KIND.unpack_from(data, offset)[0]
+            layout = _LAYOUTS.get(kind)
+            if layout is None:
+                raise ValueError('bad record kind {} at byte {}'.format(
+                    kind, offset))
+            record = layout.unpack_from(data, offset)
+            offset += layout.size
+            if kind == ROW:
+                costs = array('d')
+                costs.frombytes(data[offset:offset + row_bytes])
+                record += (costs.tolist(),)
+                offset += row_bytes
+            yield record
+
+    def events(self, node=None, start=None, end=None, kinds=None):
+        """Records filtered by node (either end), time window and kind."""
+        for record in self:
+            kind, time = record[0], record[1]
+            if kinds is not None and kind not in kinds:
+                continue
+            if start is not None and time < start:
+                continue
+            if end is not None and time > end:
+                break
+            if node is not None and node not in (
+                    record[2:3] if kind == ROW else record[2:4]):
+                continue
+            yield record
+
+    def table_at(self, time=None):
+        """Every node's vector as of `time` (default: the end of the run)."""
+        rows = {}
+        for record in self.events(end=time, kinds=(ROW,)):
+            rows[record[2]] = record[3]
+        return rows
+
+    def summary(self):
+        counts = dict.fromkeys(KIND_NAMES.values(), 0)
+        end = 0.0
+        for record in self:
+            counts[KIND_NAMES[record[0]]] += 1
+            end = max(end, record[1])
+        return {'nodes': self.num_nodes, 'end_time': end, 'records': counts}
+
+
+def format_record(record):
+    kind, time = record[0], record[1]
+    if kind == DELIVER:
+        return 't={:.4f} deliver {} -> {}'.format(time, *record[2:])
+    if kind == CHANGE:
+        return 't={:.4f} change {} <-> {} cost {}'.format(time, *record[2:])
+    if kind == SEND:
+        return 't={:.4f} send {} -> {} arrives t={:.4f}'.format(time,
+                                                              *record[2:])
+    return 't={:.4f} row node {}: {}'.format(time, record[2], record[3])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query a binary DV trace')
+    parser.add_argument('trace')
+    parser.add_argument('query', choices=['summary', 'events', 'table'])
+    parser.add_argument('--node', type=int, default=None)
+    parser.add_argument('--start', type=float, default=None)
+    parser.add_argument('--end', type=float, default=None)
+    parser.add_argument('--kind', choices=sorted(KIND_NAMES.values()),
+                        action='append', help='event kinds (repeatable)')
+    parser.add_argument('--at', type=float, default=None,
+                        help="time of the table (default: end of the run)")
+    args = parser.parse_args(argv)
+
+    reader = TraceReader(args.trace)
+    if args.query == 'summary':
+        summary = reader.summary()
+        print('nodes: {nodes}, end time: {end_time}'.format(**summary))
+        for name, count in summary['records'].items():
+            print('  {}: {}'.format(name, count))
+    elif args.query == 'events':
+        kinds = None
+        if args.kind:
+            kinds = {k for k, name in KIND_NAMES.items() if name in args.kind}
+        for record in reader.events(args.node, args.start, args.end, kinds):
+            print(format_record(record))
+    else:
+        rows = reader.table_at(args.at)
+        for node in sorted(rows):
+            if args.node is None or node == args.node:
+                print('node {}: {}'.format(node, rows[node]))
+
+
+if __name__ == '__main__':
+    main()
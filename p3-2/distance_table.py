@@ -0,0 +1,287 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Distance table storage for the distance vector entities.
+:Author: Randy Rizo
+:Version: s25
+
+A DistanceTable holds one node's N x N distance table, but only allocates
+the rows it can ever write (its own row and its neighbors' rows); every other
+row is one shared all-infinity row. The rows can be stored two ways:
+
+  - 'list':  Python lists, exactly as the original student code (default)
+  - 'numpy': NumPy float64 rows; relax() runs as vectorized array operations.
+             Only available when NumPy is installed.
+
+(There is no array('d') backend: in pure Python every element read from an
+array boxes a new float, while list rows of small integer costs share
+cached ints, so array rows were slower and no smaller.)
+
+relax() does the Bellman-Ford step of common_update. It returns the same
+improvements in the same destination order for every backend. Costs read
+back from NumPy rows come out as Python numbers with integral
+floats turned into ints (see python_costs), so every backend prints the
+same trace as the list one. recompute()
+instead rebuilds the node's row from its neighbors' latest vectors (stored
+with store()), which also handles costs going up. Both keep next_hop, the
+neighbor each destination is currently routed through; recompute() sets
+hops_changed when any of them moved.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INF = float('inf')
+BACKENDS = ('list', 'numpy')
+DEFAULT_BACKEND = 'list'
+
+
+def available_backends():
+    """Backends usable in this interpreter."""
+    return [b for b in BACKENDS if b != 'numpy' or numpy is not None]
+
+
+def python_costs(values):
+    """Float costs (NumPy values) as a list of Python numbers, with
+    integral ones as ints the way the 'list' backend holds them."""
+    return [int(cost) if cost.is_integer() else cost
+            for cost in map(float, values)]
+
+
+class DistanceTable(object):
+    """One node's distance table.
+
+    Args:
+        size (int): number of nodes N.
+        rows (iterable): node ids whose rows are allocated up front.
+        backend (str): 'list' or 'numpy'.
+    """
+
+    def __init__(self, size, rows=(), backend=DEFAULT_BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError('unknown distance table backend: {}'.format(
+                backend))
+        if backend == 'numpy' and numpy is None:
+            raise ValueError("the 'numpy' backend needs NumPy installed")
+        self.size = size
+        self.backend = backend
+        self._unknown = self._new_row()
+        if backend == 'numpy':
+            self._unknown.flags.writeable = False
+        self._rows = {}
+        self.next_hop = [None] * size
+        self.hops_changed = False
+        for node in rows:
+            self.add_row(node)
+
+    def _new_row(self):
+        if self.backend == 'numpy':
+            return numpy.full(self.size, INF)
+        return [INF for _ in range(self.size)]
+
+    def add_row(self, node):
+        """Allocate (if needed) and return a writable row for `node`."""
+        row = self._rows.get(node)
+        if row is None:
+            row = self._rows[node] = self._new_row()
+        return row
+
+    def drop_row(self, node):
+        """Forget `node`'s row (e.g. it is no longer a neighbor)."""
+        self._rows.pop(node, None)
+
+    def store(self, node, vector):
+        """Overwrite `node`'s row with the vector it advertised."""
+        row = self.add_row(node)
+        if self.backend == 'numpy':
+            row[:] = vector
+        else:
+            row[:] = list(vector)
+
+    def vector(self, node):
+        """`node`'s row as a new list of Python numbers."""
+        row = self[node]
+        return row[:] if self.backend == 'list' else python_costs(row)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, node):
+        """The row for `node`; unallocated rows are the shared, read-only one."""
+        return self._rows.get(node, self._unknown)
+
+    def __iter__(self):
+        """Rows as Python lists, in node order (for printing)."""
+        for node in range(self.size):
+            row = self[node]
+            yield row if self.backend == 'list' else python_costs(row)
+
+    def snapshot(self, node):
+        """An immutable copy of `node`'s row, to hand to to_layer_2(): a
+        tuple, or a read-only array for NumPy. One snapshot can be sent to
+        every neighbor.
+        """
+        row = self[node]
+        if self.backend == 'numpy':
+            row = row.copy()
+            row.flags.writeable = False
+            return row
+        return tuple(row)
+
+    def relax(self, node, src, link_cost, vector):
+        """Bellman-Ford relaxation of `node`'s row through neighbor `src`.
+
+        For every destination d, node's cost becomes link_cost + vector[d]
+        when that is strictly lower, and src's row keeps the lowest cost src
+        has advertised for d.
+
+        Args:
+            node (int): the owner of this table.
+            src (int): the neighbor that sent `vector`.
+            link_cost: direct cost from node to src.
+            vector: src's advertised minimum costs (length N).
+
+        Returns:
+            list: (dest, new_cost) for every improved destination, in
+            destination order.
+        """
+        own = self.add_row(node)
+        backup = self.add_row(src)
+        if self.backend == 'numpy':
+            vector = numpy.asarray(vector, dtype=float)
+            via = vector + link_cost
+            improved = numpy.flatnonzero(via < own)
+            own[improved] = via[improved]
+            numpy.minimum(backup, vector, out=backup)
+            improved = list(zip(improved.tolist(),
+                                python_costs(via[improved])))
+        else:
+            improved = []
+            for dest in range(self.size):
+                via_src_cost = link_cost + vector[dest]
+                if via_src_cost < own[dest]:
+                    own[dest] = via_src_cost
+                    improved.append((dest, via_src_cost))
+                if vector[dest] < backup[dest]:
+                    backup[dest] = vector[dest]
+        for dest, _ in improved:
+            self.next_hop[dest] = src
+        return improved
+
+    def relax_entries(self, node, src, link_cost, entries):
+        """relax() for only the (dest, cost) entries a delta update carries.
+
+        Args:
+            node (int): the owner of this table.
+            src (int): the neighbor that sent the entries.
+            link_cost: direct cost from node to src.
+            entries: (dest, cost) pairs in destination order.
+
+        Returns:
+            list: (dest, new_cost) for every improved destination, in
+            destination order.
+        """
+        own = self.add_row(node)
+        backup = self.add_row(src)
+        if self.backend == 'numpy':
+            dests = numpy.array([dest for dest, _ in entries], dtype=int)
+            costs = numpy.array([cost for _, cost in entries], dtype=float)
+            via = costs + link_cost
+            better = via < own[dests]
+            own[dests[better]] = via[better]
+            backup[dests] = numpy.minimum(backup[dests], costs)
+            improved = list(zip(dests[better].tolist(),
+                                python_costs(via[better])))
+        else:
+            improved = []
+            for dest, cost in entries:
+                via_src_cost = link_cost + cost
+                if via_src_cost < own[dest]:
+                    own[dest] = via_src_cost
+                    improved.append((dest, via_src_cost))
+                if cost < backup[dest]:
+                    backup[dest] = cost
+        for dest, _ in improved:
+            self.next_hop[dest] = src
+        return improved
+
+    def store_entries(self, node, entries):
+        """Overwrite the (dest, cost) entries of `node`'s row."""
+        row = self.add_row(node)
+        for dest, cost in entries:
+            row[dest] = cost
+
+    def recompute(self, node, link_costs, dests=None):
+        """Rebuild `node`'s row from its neighbors' stored vectors.
+
+        own[d] = min over neighbors v of link_costs[v] + row_v[d], with the
+        direct link counting as row_v[v] = 0 and own[node] = 0. Ties go to
+        the lowest-numbered neighbor.
+
+        Args:
+            node (int): the owner of this table.
+            link_costs (dict): {neighbor: direct link cost}.
+            dests (iterable): only rebuild these destinations (default: all),
+                e.g. the ones a delta update changed.
+
+        Returns:
+            list: (dest, new_cost) for every destination whose cost changed,
+            in destination order.
+        """
+        own = self.add_row(node)
+        neighbors = sorted(link_costs)
+        if self.backend == 'numpy':
+            return self._recompute_numpy(node, own, link_costs, neighbors,
+                                         dests)
+        rows = [(v, link_costs[v], self.add_row(v)) for v in neighbors]
+        self.hops_changed = False
+        changed = []
+        for dest in range(self.size) if dests is None else sorted(dests):
+            best, hop = INF, None
+            if dest == node:
+                best = 0
+            else:
+                for v, link_cost, row in rows:
+                    cost = link_cost if dest == v else link_cost + row[dest]
+                    if cost < best:
+                        best, hop = cost, v
+            if hop != self.next_hop[dest]:
+                self.next_hop[dest] = hop
+                self.hops_changed = True
+            if best != own[dest]:
+                own[dest] = best
+                changed.append((dest, best))
+        return changed
+
+    def _recompute_numpy(self, node, own, link_costs, neighbors, dests):
+        if dests is None:
+            cols = numpy.arange(self.size)
+        else:
+            cols = numpy.array(sorted(dests), dtype=int)
+        best = numpy.full(len(cols), INF)
+        hops = numpy.full(len(cols), -1)
+        if neighbors and len(cols):
+            costs = numpy.array([link_costs[v] for v in neighbors],
+                                dtype=float)
+            via = numpy.array([self.add_row(v)[cols] for v in neighbors])
+            via += costs[:, None]
+            # the direct link to a neighbor that is one of the columns
+            pos = numpy.searchsorted(cols, neighbors)
+            found = numpy.minimum(pos, len(cols) - 1)
+            direct = numpy.flatnonzero(cols[found] == neighbors)
+            via[direct, found[direct]] = costs[direct]
+            index = numpy.argmin(via, axis=0)
+            best = via[index, numpy.arange(len(cols))]
+            hops = numpy.array(neighbors)[index]
+        best[cols == node] = 0
+        differs = best != own[cols]
+        changed = cols[differs]
+        own[changed] = best[differs]
+        self.hops_changed = False
+        for dest, hop, cost in zip(cols.tolist(), hops.tolist(),
+                                   best.tolist()):
+            hop = hop if cost != INF and dest != node else None
+            if hop != self.next_hop[dest]:
+                self.next_hop[dest] = hop
+                self.hops_changed = True
+        return list(zip(changed.tolist(), python_costs(own[changed])))
@@ -8,12 +8,17 @@ https://media.pearsoncmg.com/aw/aw_kurose_network_3/labs/lab6/lab6.html
 
 FROM_LAYER_2 = 0
 LINK_CHANGE = 1
+TIMER = 2  # one of an entity's timers expired
 
 
 class Event(object):
+    __slots__ = ('time', 'type', 'entity', 'packet', 'change', 'timer')
 
-    def __init__(self, time, type, entity, packet=None):
+    def __init__(self, time, type, entity, packet=None, change=None,
+                 timer=None):
         self.time = time
         self.type = type
         self.entity = entity
         self.packet = packet
+        self.change = change  # LINK_CHANGE: (other entity, new cost)
+        self.timer = timer    # TIMER: 'hold_down', 'route' or 'refresh'
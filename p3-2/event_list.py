@@ -5,35 +5,48 @@ https://media.pearsoncmg.com/aw/aw_kurose_network_3/labs/lab6/lab6.html
 :Author: Kevin Lundeen
 :Version: s23
 """
+import heapq
+import itertools
+
 from event import *
 
 
 class EventList(object):
+    """Pending events ordered by time.
+
+    Events live in a binary heap keyed by (time, insertion order), so
+    remove_next is O(log n) and events with equal times come out in the order
+    they were added, exactly as the original linear scan did.
+
+    last_packet_time is O(1): packets on one (src, dest) link are always
+    scheduled after the previous one on that link (FIFO per link), so the
+    latest pending arrival is simply the last one added. The table forgets a
+    link once that packet has been removed.
+    """
 
     def __init__(self):
         self.data = []
+        self._counter = itertools.count()
+        self._last_arrival = {}
+
+    def __len__(self):
+        return len(self.data)
 
     def add(self, event):
-        self.data.append(event)
+        heapq.heappush(self.data, (event.time, next(self._counter), event))
+        if event.type == FROM_LAYER_2:
+            self._last_arrival[(event.packet.src, event.entity)] = event
 
     def last_packet_time(self, entity_from, entity_to):
-        time = 0.0
-        for event in self.data:
-            if (
-                    event.type == FROM_LAYER_2 and event.entity == entity_to
-                    and event.packet.src == entity_from):
-                time = event.time
-        return time
+        event = self._last_arrival.get((entity_from, entity_to))
+        return 0.0 if event is None else event.time
 
     def remove_next(self):
         if len(self.data) == 0:
             return None
-        first_index = 0
-        first = self.data[first_index].time
-        for i, event in enumerate(self.data):
-            if event.time < first:
-                first = event.time
-                first_index = i
-        next_event = self.data[first_index]
-        self.data.pop(first_index)
+        _, _, next_event = heapq.heappop(self.data)
+        if next_event.type == FROM_LAYER_2:
+            link = (next_event.packet.src, next_event.entity)
+            if self._last_arrival.get(link) is next_event:
+                del self._last_arrival[link]
         return next_event
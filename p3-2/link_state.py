@@ -0,0 +1,206 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Link-state routing engine for the network simulator.
+:Author: Randy Rizo
+:Version: s25
+
+A LinkStateEntity floods link-state advertisements (LSAs) and runs Dijkstra
+over its link-state database instead of exchanging distance vectors. It plugs
+into the same NetworkSimulator event loop (engine='ls') and reports the same
+metrics, so the two control planes can be compared on identical topologies.
+
+  - An LSA is (origin, sequence number, ((neighbor, cost), ...)). A node
+    originates a new one, with the next sequence number, at start-up and on
+    every change to one of its links.
+  - An LSA newer than the stored one from its origin replaces it and is
+    flooded to every neighbor except the one it came from; older or equal
+    ones are dropped. A link coming up also sends the new neighbor the whole
+    database, so it catches up on LSAs flooded before the link existed.
+  - Shortest paths come from a heap-based Dijkstra kept per node. An LSA that
+    only lowers or adds links is applied incrementally, relaxing outward
+    from the nodes it improves; anything else reruns Dijkstra from scratch.
+"""
+import heapq
+
+from entity import Entity
+from student_utilities import flood_lsa, new_distance_table, routes_changed
+
+INF = float('inf')
+
+
+class LinkStateEntity(Entity):
+    """
+    A link-state node for a topology of any size.
+
+    Args:
+        node (int): this node's id.
+        costs (list): direct link cost to every node (0 to itself, inf when
+            not linked).
+        network: the NetworkSimulator this node sends through (default: the
+            one that is running). Its verbose flag turns our printing off.
+    """
+
+    def __init__(self, node, costs, network=None):
+        self.id = node
+        self.network = network
+        self.verbose = network is None or network.verbose
+        self.costs = list(costs)
+        self.neighbors = [dest for dest, cost in enumerate(self.costs)
+                          if dest != node and cost != INF]
+        n = len(self.costs)
+        self.lsdb = {}            # origin -> LSA
+        self.graph = [{} for _ in range(n)]   # origin -> {neighbor: cost}
+        self.dist = [INF] * n
+        self.dist[node] = 0
+        self.parent = [None] * n
+        self.seq = 0
+        self.spf_full = 0
+        self.spf_incremental = 0
+        self.distance_table = new_distance_table(n, [node], network)
+        self.distance_table.store(node, self.dist)
+        if self.verbose:
+            print(f"entity {self.id}: initializing link state")
+        self.originate()
+
+    def mincost(self):
+        """Our current minimum cost to every node, as a list."""
+        return list(self.dist)
+
+    def originate(self):
+        """Install and flood a new LSA describing our current links."""
+        self.seq += 1
+        links = tuple((neighbor, self.costs[neighbor])
+                      for neighbor in self.neighbors)
+        lsa = (self.id, self.seq, links)
+        self.install(lsa)
+        self.flood(lsa)
+
+    def flood(self, lsa, exclude=None):
+        for neighbor in self.neighbors:
+            if neighbor != exclude:
+                flood_lsa(self.id, neighbor, lsa, self.network)
+
+    def update(self, packet):
+        """
+        Handle an LSA from a neighbor: keep and re-flood it if it is newer
+        than what we have from its origin.
+
+        Args:
+        packet: the packet carrying the LSA.
+        """
+        origin, seq, _ = lsa = packet.lsa
+        stored = self.lsdb.get(origin)
+        if stored is not None and stored[1] >= seq:
+            if self.verbose:
+                print(f"node {self.id}: old LSA {origin}#{seq} from {packet.src} dropped")
+            return
+        if self.verbose:
+            print(f"node {self.id}: LSA {origin}#{seq} from {packet.src}")
+        self.install(lsa)
+        self.flood(lsa, exclude=packet.src)
+
+    def link_cost_change(self, to_entity, new_cost):
+        """
+        Re-originate our LSA for the changed link.
+
+        A link coming up also gets our whole database, so the new neighbor
+        learns what was flooded before it was connected.
+
+        Args:
+        to_entity (int): ID of the neighbor whose link cost changed.
+        new_cost (int): New cost of the link to that neighbor.
+        """
+        if self.verbose:
+            print(f"node {self.id}: link cost change to {to_entity} from {self.costs[to_entity]} to {new_cost}")
+        came_up = new_cost != INF and to_entity not in self.neighbors
+        self.costs[to_entity] = new_cost
+        if new_cost == INF:
+            if to_entity in self.neighbors:
+                self.neighbors.remove(to_entity)
+        elif came_up:
+            self.neighbors.append(to_entity)
+            self.neighbors.sort()
+        self.originate()
+        if came_up:
+            for origin in sorted(self.lsdb):
+                if origin != self.id:
+                    flood_lsa(self.id, to_entity, self.lsdb[origin],
+                              self.network)
+
+    def install(self, lsa):
+        """Store an LSA and update our shortest paths for it."""
+        origin, _, links = lsa
+        self.lsdb[origin] = lsa
+        old, new = self.graph[origin], dict(links)
+        self.graph[origin] = new
+        if all(new.get(v, INF) <= cost for v, cost in old.items()):
+            self.spf_incremental += 1
+            changed = self.relax_from(origin, new)
+        else:
+            self.spf_full += 1
+            changed = self.dijkstra()
+        if changed:
+            row = self.distance_table[self.id]
+            for dest in changed:
+                row[dest] = self.dist[dest]
+            routes_changed(self.id, self.network)
+            if self.verbose:
+                self.printdt()
+
+    def relax_from(self, origin, links):
+        """
+        Incremental Dijkstra after origin's links only got cheaper (or new).
+
+        Returns:
+            set: destinations whose cost changed.
+        """
+        dist, parent, graph = self.dist, self.parent, self.graph
+        heap = []
+        if dist[origin] != INF:
+            for v, cost in links.items():
+                if dist[origin] + cost < dist[v]:
+                    dist[v] = dist[origin] + cost
+                    parent[v] = origin
+                    heapq.heappush(heap, (dist[v], v))
+        changed = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            changed.add(u)
+            for v, cost in graph[u].items():
+                if d + cost < dist[v]:
+                    dist[v] = d + cost
+                    parent[v] = u
+                    heapq.heappush(heap, (dist[v], v))
+        return changed
+
+    def dijkstra(self):
+        """
+        Shortest paths from scratch over the link-state database.
+
+        Returns:
+            set: destinations whose cost changed.
+        """
+        n = len(self.dist)
+        dist = [INF] * n
+        parent = [None] * n
+        dist[self.id] = 0
+        heap = [(0, self.id)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, cost in self.graph[u].items():
+                if d + cost < dist[v]:
+                    dist[v] = d + cost
+                    parent[v] = u
+                    heapq.heappush(heap, (dist[v], v))
+        changed = {dest for dest in range(n) if dist[dest] != self.dist[dest]}
+        self.dist, self.parent = dist, parent
+        return changed
+
+    def printdt(self):
+        """Print our minimum cost to every node."""
+        print(f"node: {self.id}")
+        print(self.dist)
@@ -0,0 +1,105 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Convergence and control-plane metrics for the routing simulator.
+:Author: Randy Rizo
+:Version: s25
+
+A run is split into epochs at its link changes: epoch 0 runs from the start
+to the first change, epoch 1 from there to the next change, and so on. For
+each epoch RunMetrics records when the last route change happened (the
+convergence time is measured from the epoch's start), the messages and bytes
+sent, and, when given the simulator's tables and the topology, whether every
+node's minimum costs match the shortest-path oracle.
+"""
+
+
+class RunMetrics(object):
+    """
+    Per-node message/byte counters and per-epoch convergence of one run.
+
+    Args:
+        num_nodes (int): number of nodes in the topology.
+    """
+
+    def __init__(self, num_nodes):
+        self.messages_sent = [0] * num_nodes
+        self.bytes_sent = [0] * num_nodes
+        self.messages_received = [0] * num_nodes
+        self.bytes_received = [0] * num_nodes
+        self.epochs = []
+        self._start_epoch(0.0)
+
+    def _start_epoch(self, time):
+        self.epoch_start = time
+        self.converged_at = time
+        self.epoch_messages = 0
+        self.epoch_bytes = 0
+
+    def sent(self, node, size):
+        self.messages_sent[node] += 1
+        self.bytes_sent[node] += size
+        self.epoch_messages += 1
+        self.epoch_bytes += size
+
+    def received(self, node, size):
+        self.messages_received[node] += 1
+        self.bytes_received[node] += size
+
+    def route_changed(self, time):
+        self.converged_at = time
+
+    def end_epoch(self, time, tables=None, topology=None):
+        """
+        Close the current epoch at `time` and start the next one.
+
+        Args:
+            time (float): when the epoch ends (a link change or the end of
+                the run).
+            tables (list): every node's minimum costs, to check against the
+                oracle (None: not checked).
+            topology (Topology): the topology as it stood during the epoch.
+
+        Returns:
+            dict: the epoch's record, also appended to self.epochs.
+        """
+        epoch = {
+            'epoch': len(self.epochs),
+            'start': self.epoch_start,
+            'end': time,
+            'converged_at': self.converged_at,
+            'convergence_time': self.converged_at - self.epoch_start,
+            'messages': self.epoch_messages,
+            'bytes': self.epoch_bytes,
+            'correct': None,
+            'wrong_routes': None,
+        }
+        if tables is not None:
+            wrong = count_wrong_routes(tables, topology.all_pairs())
+            epoch['correct'] = wrong == 0
+            epoch['wrong_routes'] = wrong
+        self.epochs.append(epoch)
+        self._start_epoch(time)
+        return epoch
+
+    def to_dict(self):
+        checked = [e['correct'] for e in self.epochs if e['correct'] is not None]
+        return {
+            'convergence_time': sum(e['convergence_time'] for e in self.epochs),
+            'max_epoch_convergence_time': max(
+                (e['convergence_time'] for e in self.epochs), default=0.0),
+            'messages': sum(self.messages_sent),
+            'bytes': sum(self.bytes_sent),
+            'correct': all(checked) if checked else None,
+            'epochs': self.epochs,
+            'messages_sent': self.messages_sent,
+            'bytes_sent': self.bytes_sent,
+            'messages_received': self.messages_received,
+            'bytes_received': self.bytes_received,
+        }
+
+
+def count_wrong_routes(tables, oracle):
+    """Number of (node, destination) costs that differ from the oracle's."""
+    return sum(cost != best
+               for row, best_row in zip(tables, oracle)
+               for cost, best in zip(row, best_row))
@@ -7,41 +7,189 @@ https://media.pearsoncmg.com/aw/aw_kurose_network_3/labs/lab6/lab6.html
 """
 import random
 
+from binary_trace import TraceWriter
+from distance_table import DEFAULT_BACKEND
 from event_list import *
+from link_state import LinkStateEntity
+from metrics import RunMetrics
 from student_entities import *
+from topology import Topology
 
 INF = float('inf')
 NUM_ENTITIES = 4
+HORIZONS = ('off', 'split', 'poison')
+ENGINES = ('dv', 'ls')  # distance vector, link state
+TIMER_MESSAGES = {'hold_down': 'Hold-down timer expired.',
+                  'route': 'Route timeout expired.',
+                  'refresh': 'Refresh timer expired.'}
 
 
 class NetworkSimulator(object):
-    """simulator for the project--invoked from project.py"""
+    """simulator for the project--invoked from project.py
 
-    event_list = EventList()
-    cost = [[0, 1, 3, 7], [1, 0, 1, INF], [3, 1, 0, 2], [7, INF, 2, 0]]
-    time = 0.0
-    has_change = False
-    trace = False
+    Each NetworkSimulator is one independent run: its own event list, clock,
+    random generator and copy of the topology, so any number of them can
+    coexist (batch.py runs many of them in parallel processes).
+
+    With no topology the original 4-node network and its two link changes are
+    simulated with the Entity0..Entity3 classes. Any other Topology gets one
+    generic DistanceVectorEntity per node and its own link-change schedule.
+    engine='ls' runs a LinkStateEntity per node instead (see link_state.py);
+    the distance vector options below then do not apply.
+    table_backend picks how the entities store their distance tables
+    ('list' or 'numpy'; see distance_table.py).
+
+    Distance vector options (the defaults are the original lab's behavior):
+      recompute   rebuild a node's vector from its neighbors' latest vectors
+                  on every update and link change, so costs can go up as well
+                  as down (the original only ever lowers a cost)
+      horizon     'off', 'split' (split horizon) or 'poison' (poisoned
+                  reverse); either implies recompute. Split horizon leaves
+                  the routes a node has through a neighbor out of what it
+                  tells that neighbor, which keeps its previous value for
+                  them; poisoned reverse advertises them as inf
+      route_timeout  with split horizon, how long a neighbor keeps a route
+                  that was left out before it expires (0: never), like RIP's
+                  route timeout. There are no periodic updates to wait out
+                  here, so it is short: every topology change waits this long
+                  for the routes it left out (RIP's 180 makes split horizon
+                  converge later than no horizon at all)
+      hold_down   coalesce the updates a node triggers within this many time
+                  units into one send (0: send at once)
+      delta       advertise only the (dest, cost) entries that changed since
+                  the last update to that neighbor; receivers relax only
+                  those destinations
+      refresh_every  with delta, a node sends its full vector to every
+                  neighbor it sent deltas to, this many time units after the
+                  first of them (0: never); the timer is only started by a
+                  delta, so a network with nothing changing stays quiet
+
+    verbose=False silences the entities' and the simulator's own text output
+    (their messages are not even formatted). record names a file to write a
+    binary trace of the run to (see binary_trace.py).
+
+    After run(): time is when the last event happened, messages counts the
+    packets sent through to_layer_2, events the events processed and
+    last_change the time of the last link change (0.0 if there was none).
+    metrics is a RunMetrics with per-node message and byte counts and, for
+    every link-change epoch, its convergence time; with check=True each
+    epoch's tables are also checked against Topology.all_pairs().
+    """
+
+    active = None  # the simulator whose run() is in progress
+
+    def __init__(self, topology=None, has_change=False, trace=0, seed=None,
+                 table_backend=DEFAULT_BACKEND, verbose=True, record=None,
+                 recompute=False, horizon='off', hold_down=0.0, check=False,
+                 engine='dv', delta=False, refresh_every=100.0,
+                 route_timeout=10.0):
+        if engine not in ENGINES:
+            raise ValueError('engine must be one of {}'.format(
+                ', '.join(ENGINES)))
+        if horizon not in HORIZONS:
+            raise ValueError('horizon must be one of {}'.format(
+                ', '.join(HORIZONS)))
+        self.builtin = topology is None
+        self.topology = Topology.default() if topology is None \
+            else topology.copy()
+        self.has_change = has_change
+        self.trace = trace
+        self.seed = seed
+        self.table_backend = table_backend
+        self.verbose = verbose
+        self.record = record
+        self.recorder = None
+        self.horizon = horizon
+        self.recompute = recompute or horizon != 'off'
+        self.hold_down = hold_down
+        self.delta = delta
+        self.refresh_every = refresh_every
+        self.route_timeout = route_timeout
+        self.check = check
+        self.engine = engine
+        self.metrics = RunMetrics(self.num_entities)
+        self.rng = random.Random(seed)
+        self.event_list = EventList()
+        self.entities = []
+        self.time = 0.0
+        self.messages = 0
+        self.events = 0
+        self.last_change = 0.0
+
+    @property
+    def num_entities(self):
+        return self.topology.num_nodes
 
     @classmethod
-    def run_simulator(cls, has_change, trace, seed):
-        cls.has_change = has_change
-        cls.trace = trace
-        random.seed(seed)
-
-        cls.time = 0.0
-        print('\n\nSimulator started at t =', cls.time, '\n')
-        cls.event_list = EventList()
-        entities = [Entity0(), Entity1(), Entity2(), Entity3()]
-        if has_change:
-            NetworkSimulator.event_list.add(Event(10000.0, LINK_CHANGE, 0))
-            NetworkSimulator.event_list.add(Event(20000.0, LINK_CHANGE, 0))
+    def run_simulator(cls, has_change, trace, seed, topology=None,
+                      table_backend=DEFAULT_BACKEND, verbose=True,
+                      record=None, **options):
+        """Build and run one simulation (the original entry point)."""
+        return cls(topology, has_change, trace, seed, table_backend, verbose,
+                   record, **options).run()
+
+    def run(self):
+        """Run until no packets are left in the medium; returns self."""
+        previous, NetworkSimulator.active = NetworkSimulator.active, self
+        if self.record:
+            self.recorder = TraceWriter(self.record, self.num_entities)
+        try:
+            self._run()
+        finally:
+            NetworkSimulator.active = previous
+            if self.recorder is not None:
+                self.recorder.close()
+        return self
+
+    def final_tables(self):
+        """Every node's minimum costs, as a list of lists."""
+        return [entity.mincost() for entity in self.entities]
+
+    def summary(self):
+        """The run's metrics plus its end time and event count."""
+        summary = self.metrics.to_dict()
+        summary.update(nodes=self.num_entities, end_time=self.time,
+                       events=self.events)
+        return summary
+
+    def _end_epoch(self):
+        tables = self.final_tables() if self.check else None
+        self.metrics.end_epoch(self.time, tables, self.topology)
+
+    def _record_row(self, node):
+        entity = self.entities[node]
+        self.recorder.row(self.time, node, entity.distance_table[node])
+
+    def _run(self):
+        if self.verbose:
+            print('\n\nSimulator started at t =', self.time, '\n')
+        if self.engine == 'ls':
+            self.entities = [
+                LinkStateEntity(node, self.topology.cost_vector(node), self)
+                for node in range(self.num_entities)]
+        elif self.builtin:
+            self.entities = [Entity0(self), Entity1(self), Entity2(self),
+                             Entity3(self)]
+        else:
+            self.entities = [
+                DistanceVectorEntity(node, self.topology.cost_vector(node),
+                                     self)
+                for node in range(self.num_entities)]
+        recorder = self.recorder
+        if recorder is not None:
+            for node in range(self.num_entities):
+                self._record_row(node)
+        if self.has_change:
+            for time, u, v, new_cost in self.topology.changes:
+                self.event_list.add(
+                    Event(time, LINK_CHANGE, u, change=(v, new_cost)))
 
         while True:
-            event = cls.event_list.remove_next()
+            event = self.event_list.remove_next()
             if event is None:
                 break
-            if cls.trace > 1:
+            self.events += 1
+            if self.trace > 1:
                 print()
                 print('main(): event received. t=' + str(
                     event.time) + ', node=' + str(event.entity))
@@ -49,48 +197,83 @@ class NetworkSimulator(object):
                     print(' ', event.packet)
                 elif event.type == LINK_CHANGE:
                     print(' ', 'Link cost change.')
+                elif event.type == TIMER:
+                    print(' ', TIMER_MESSAGES[event.timer])
 
-            cls.time = event.time
+            self.time = event.time
 
             if event.type == FROM_LAYER_2:
                 p = event.packet
-                if event.entity not in range(NUM_ENTITIES + 1):
+                if event.entity not in range(self.num_entities):
                     print('main(): Panic. Unknown event entity.')
                 else:
-                    entities[event.entity].update(p)
+                    self.metrics.received(event.entity, p.size())
+                    if recorder is not None:
+                        recorder.deliver(self.time, p.src, event.entity)
+                    self.entities[event.entity].update(p)
+                    if recorder is not None:
+                        self._record_row(event.entity)
             elif event.type == LINK_CHANGE:
-                if cls.time < 10001.0:
-                    cls.cost[0][1] = 20
-                    cls.cost[1][0] = 20
-                    entities[0].link_cost_change(1, 20)
-                    entities[1].link_cost_change(0, 20)
-                else:
-                    cls.cost[0][1] = 1
-                    cls.cost[1][0] = 1
-                    entities[0].link_cost_change(1, 1)
-                    entities[1].link_cost_change(0, 1)
+                u = event.entity
+                v, new_cost = event.change
+                if event.time > self.metrics.epoch_start:
+                    self._end_epoch()
+                self.last_change = event.time
+                self.topology.set_cost(u, v, new_cost)
+                if recorder is not None:
+                    recorder.change(self.time, u, v, new_cost)
+                self.entities[u].link_cost_change(v, new_cost)
+                self.entities[v].link_cost_change(u, new_cost)
+                if recorder is not None:
+                    self._record_row(u)
+                    self._record_row(v)
+            elif event.type == TIMER:
+                # hold_down_expired(), route_expired() or refresh_expired()
+                getattr(self.entities[event.entity],
+                        event.timer + '_expired')()
+                if recorder is not None:
+                    self._record_row(event.entity)
             else:
                 print('main(): Panic. Unknown event type.')
-        print('Simulator terminated at t =', cls.time,
-              '-- no packets in medium.')
+        self._end_epoch()
+        if self.verbose:
+            print('Simulator terminated at t =', self.time,
+                  '-- no packets in medium.')
 
-    @classmethod
-    def _to_layer_2(cls, p):
+    def _start_timer(self, entity, delay, timer='hold_down'):
+        """Students do not call this directly. Use start_timer from
+        student_utilities module.
+        """
+        self.event_list.add(Event(self.time + delay, TIMER, entity,
+                                  timer=timer))
+
+    def _routes_changed(self, entity):
+        """Students do not call this directly. Use routes_changed from
+        student_utilities module.
+        """
+        self.metrics.route_changed(self.time)
+
+    def _to_layer_2(self, p):
         """Students do not call this directly. Use to_layer_2 function from
         student_utilities module.
         """
         if p.src == p.dest:
             raise ValueError('packet has same src and dest')
-        if cls.cost[p.src][p.dest] == INF:
+        if self.topology.cost(p.src, p.dest) == INF:
             raise ValueError('src not connected to dest')
-        if cls.trace > 2:
+        if self.trace > 2:
             print('to_layer_2():', p)
-        arrival = cls.event_list.last_packet_time(p.src, p.dest)
+        self.messages += 1
+        self.metrics.sent(p.src, p.size())
+        arrival = self.event_list.last_packet_time(p.src, p.dest)
         if arrival == 0.0:
-            arrival = cls.time
-        arrival += 1.0 + random.random() * 9.0
-        if cls.trace > 2:
+            arrival = self.time
+        arrival += 1.0 + self.rng.random() * 9.0
+        if self.trace > 2:
             print('to_layer_2(): Scheduling arrival of packet.')
 
+        if self.recorder is not None:
+            self.recorder.send(self.time, p.src, p.dest, arrival)
+
         event = Event(arrival, FROM_LAYER_2, p.dest, p)
-        cls.event_list.add(event)
+        self.event_list.add(event)
@@ -5,21 +5,78 @@ https://media.pearsoncmg.com/aw/aw_kurose_network_3/labs/lab6/lab6.html
 :Author: Kevin Lundeen
 :Version: s23
 """
-import network_simulator
+from distance_table import python_costs
+
+NUM_ENTITIES = 4
+HEADER_BYTES = 8  # src and dest as 32-bit ints
+COST_BYTES = 8    # one 64-bit float per destination
+LSA_HEADER_BYTES = 8   # origin and sequence number as 32-bit ints
+LSA_LINK_BYTES = 12    # neighbor as a 32-bit int, cost as a 64-bit float
+DELTA_ENTRY_BYTES = 12  # destination as a 32-bit int, cost as a 64-bit float
+
+
+def freeze(costs):
+    """An immutable copy of a cost vector; tuples and read-only NumPy rows
+    are already immutable and are returned as they are, so one broadcast can
+    share a single vector across all of its packets.
+    """
+    if isinstance(costs, tuple):
+        return costs
+    flags = getattr(costs, 'flags', None)  # NumPy row
+    if flags is not None:
+        if not flags.writeable:
+            return costs
+        costs = costs.copy()
+        costs.flags.writeable = False
+        return costs
+    return tuple(costs)
 
 
 class Packet(object):
-    def __init__(self, src, dest, mincost):
-        if not self.valid(src) or not self.valid(dest):
+    """A routing message: a distance vector (mincost), a list of entries
+    ((dest, cost), ...) (a delta update of only the changed ones, or the
+    routes split horizon offers, where cost None marks a route no longer
+    offered), or for link state an LSA (origin, sequence number, ((neighbor, cost), ...)). The last two
+    come with an empty mincost. mincost is always immutable (see freeze()).
+    """
+    __slots__ = ('src', 'dest', 'mincost', 'lsa', 'delta')
+
+    def __init__(self, src, dest, mincost, num_entities=NUM_ENTITIES,
+                 lsa=None, delta=None):
+        if not self.valid(src, num_entities) or \
+                not self.valid(dest, num_entities):
             raise ValueError('Illegal entity for packet')
         self.src = src
         self.dest = dest
-        self.mincost = mincost[:]
+        self.mincost = freeze(mincost)
+        self.lsa = lsa
+        self.delta = delta
 
     def __str__(self):
+        if self.lsa is not None:
+            origin, seq, links = self.lsa
+            return 'src={}, dest={}, lsa={}#{} {}'.format(
+                self.src, self.dest, origin, seq, list(links))
+        if self.delta is not None:
+            return 'src={}, dest={}, entries={}'.format(
+                self.src, self.dest, list(self.delta))
+        mincost = self.mincost
+        if isinstance(mincost, tuple):
+            mincost = list(mincost)
+        else:
+            mincost = python_costs(mincost)  # NumPy row
         return 'src={}, dest={}, mincost={}'.format(self.src, self.dest,
-                                                    self.mincost)
+                                                    mincost)
+
+    def size(self):
+        """Bytes this packet would take on the wire."""
+        if self.lsa is not None:
+            return (HEADER_BYTES + LSA_HEADER_BYTES
+                    + LSA_LINK_BYTES * len(self.lsa[2]))
+        if self.delta is not None:
+            return HEADER_BYTES + DELTA_ENTRY_BYTES * len(self.delta)
+        return HEADER_BYTES + COST_BYTES * len(self.mincost)
 
     @staticmethod
-    def valid(entity):
-        return entity in range(network_simulator.NUM_ENTITIES + 1)
+    def valid(entity, num_entities=NUM_ENTITIES):
+        return entity in range(num_entities)
@@ -4,29 +4,140 @@ Based on the Java version of Kurose/Ross lab 6
 https://media.pearsoncmg.com/aw/aw_kurose_network_3/labs/lab6/lab6.html
 :Author: Kevin Lundeen
 :Version: s23
+
+Run with no arguments to be prompted for the settings as before, or give
+them on the command line to run non-interactively, e.g.
+    python3 project.py --trace 2 --change --seed 42 --topology random:20
+    python3 project.py --quiet --seed 42 --topology random:500 --record run.dvt
+    python3 project.py --change --horizon poison --hold-down 5
+    python3 project.py --change --recompute --delta --topology random:20
+    python3 project.py --change --engine ls --topology random:20
 """
+import argparse
 import random
+import sys
+
+from distance_table import DEFAULT_BACKEND, available_backends
+from network_simulator import ENGINES, HORIZONS, NetworkSimulator
+from topology import Topology
+
+
+def load_topology(text, seed):
+    """'' for the built-in network, random:<nodes> or a topology file."""
+    if text.startswith('random:'):
+        return Topology.random(int(text[len('random:'):]), num_changes=2,
+                               seed=seed)
+    if text:
+        return Topology.load(text)
+    return None
+
+
+def ask_more(prompt):
+    """
+    input() for the prompts the original lab did not have. Scripts written
+    for the original three answers run out of stdin here, so end of input
+    is taken as an empty answer (the default) instead of an error.
+    """
+    try:
+        return input(prompt)
+    except EOFError:
+        print()
+        return ''
+
+
+def prompt_settings():
+    """Ask for the settings on stdin, the way the original lab did."""
+    buffer = input('Enter trace level (>= 0): [0] ')
+    try:
+        trace = int(buffer)
+    except ValueError:
+        trace = 0
+    print('Trace level set to', trace)
+
+    buffer = input('Will the link change (Yes/No)? [No] ')
+    has_link_change = buffer.lower().strip().startswith('y')
+    print('Link will change:', 'Yes' if has_link_change else 'No')
+
+    buffer = input('Enter random seed: [random] ')
+    try:
+        seed = int(buffer)
+    except ValueError:
+        seed = random.randrange(int(1e14))
+    print('Random seed:', seed)
+
+    buffer = ask_more('Enter topology file, or random:<nodes>: [built-in] ')
+    topology = load_topology(buffer.strip(), seed)
+    print('Topology:', topology or 'built-in 4-node network')
+
+    backends = available_backends()
+    buffer = ask_more('Distance table backend ({}): [{}] '.format(
+        '/'.join(backends), DEFAULT_BACKEND)).strip().lower()
+    backend = buffer if buffer in backends else DEFAULT_BACKEND
+    print('Distance table backend:', backend)
+    return trace, has_link_change, seed, topology, backend
 
-from network_simulator import NetworkSimulator
 
-print('Network Simulator v1.0')
+def parse_settings(argv):
+    parser = argparse.ArgumentParser(
+        description='Distance vector routing simulator')
+    parser.add_argument('--trace', type=int, default=0,
+                        help='trace level (>= 0)')
+    parser.add_argument('--change', action='store_true',
+                        help='apply the scheduled link-cost changes')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='random seed (default: random)')
+    parser.add_argument('--topology', default='',
+                        help='topology file or random:<nodes> '
+                             '(default: the built-in 4-node network)')
+    parser.add_argument('--backend', default=DEFAULT_BACKEND,
+                        choices=available_backends(),
+                        help='distance table backend')
+    parser.add_argument('--engine', default='dv', choices=ENGINES,
+                        help='distance vector or link state')
+    parser.add_argument('--recompute', action='store_true',
+                        help='rebuild vectors from neighbor vectors')
+    parser.add_argument('--horizon', default='off', choices=HORIZONS,
+                        help='split horizon / poisoned reverse')
+    parser.add_argument('--hold-down', type=float, default=0.0,
+                        help='coalesce triggered updates over this long')
+    parser.add_argument('--route-timeout', type=float, default=10.0,
+                        help='with --horizon split, how long a route left '
+                             'out stays before it expires (0: never)')
+    parser.add_argument('--delta', action='store_true',
+                        help='advertise only the entries that changed')
+    parser.add_argument('--refresh-every', type=float, default=100.0,
+                        help='with --delta, send a full vector this long after '
+                             'a neighbor first gets a delta (0: never)')
+    parser.add_argument('--quiet', action='store_true',
+                        help="no per-event text from the nodes")
+    parser.add_argument('--record', metavar='FILE', default=None,
+                        help='write a binary trace (see binary_trace.py)')
+    args = parser.parse_args(argv)
+    seed = args.seed
+    if seed is None:
+        seed = random.randrange(int(1e14))
+    options = {'engine': args.engine, 'recompute': args.recompute,
+               'horizon': args.horizon, 'hold_down': args.hold_down,
+               'route_timeout': args.route_timeout, 'delta': args.delta,
+               'refresh_every': args.refresh_every}
+    return (args.trace, args.change, seed,
+            load_topology(args.topology, seed), args.backend,
+            not args.quiet, args.record, options)
 
-buffer = input('Enter trace level (>= 0): [0] ')
-try:
-    trace = int(buffer)
-except ValueError:
-    trace = 0
-print('Trace level set to', trace)
 
-buffer = input('Will the link change (Yes/No)? [No] ')
-has_link_change = buffer.lower().strip().startswith('y')
-print('Link will change:', 'Yes' if has_link_change else 'No')
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    print('Network Simulator v1.0')
+    if argv:
+        settings = parse_settings(argv)
+    else:
+        settings = prompt_settings() + (True, None, {})
+    (trace, has_link_change, seed, topology, backend, verbose, record,
+     options) = settings
+    return NetworkSimulator.run_simulator(has_link_change, trace, seed,
+                                          topology, backend, verbose, record,
+                                          **options)
 
-buffer = input('Enter random seed: [random] ')
-try:
-    seed = int(buffer)
-except ValueError:
-    seed = random.randrange(int(1e14))
-print('Random seed:', seed)
 
-NetworkSimulator.run_simulator(has_link_change, trace, seed)
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,8 @@ version: s25
 
 # YOU MAY NOT ADD ANY IMPORTS
 from entity import Entity
-from student_utilities import to_layer_2
+from student_utilities import (to_layer_2, new_distance_table, start_timer,
+                               routes_changed, send_delta)
 
 
 
@@ -16,12 +17,22 @@ def common_init(self):
 
     Sets the initial row of the distance table using direct link costs, logs the 
     table, and sends the initial minimum cost vector to all neighbors.
+
+    Only our own row and our neighbors' rows are ever written, so every other
+    row is one shared all-infinity row; that keeps a node's table at
+    O(N * degree) entries instead of O(N^2) on large topologies. The rows are
+    lists or NumPy arrays depending on the simulator's table backend.
     """
-    self.distance_table = [[float('inf') for _ in range(4)] for _ in range(4)]
-    print(f"entity {self.id}: initializing")
-    for dest in range(4):
+    n = len(self.costs)
+    self.distance_table = new_distance_table(n, [self.id] + self.neighbors,
+                                             self.network)
+    for dest in range(n):
         self.distance_table[self.id][dest] = self.costs[dest]
-    self.printdt()
+    for neighbor in self.neighbors:
+        self.distance_table.next_hop[neighbor] = neighbor
+    if self.verbose:
+        print(f"entity {self.id}: initializing")
+        self.printdt()
     self.send_update()
 
 def common_update(self, packet):
@@ -29,63 +40,138 @@ def common_update(self, packet):
     Process incoming routing info to see if we have a better route.
 
     For each destination, checks whether the path through the source provides
-    a lower cost. If any improvements are made, updates the table and sends
-    the new minimum cost vector to neighbors.
+    a lower cost (one Bellman-Ford relaxation of our row, vectorized when the
+    table is NumPy-backed). If any improvements are made, updates the table
+    and sends the new minimum cost vector to neighbors.
+
+    With recompute on, the source's vector replaces its row and our row is
+    rebuilt from all neighbors' rows, so a cost can go up as well as down.
+    A delta update only carries the entries that changed, so only those
+    destinations are relaxed or rebuilt. Under split horizon an entry with
+    cost None is a route the source has stopped telling us about: we keep
+    its previous cost until the route times out (see route_expired()).
 
     Args:
         packet: The distance vector packet received from a neighbor.
     """
-    updated = False
     src = packet.src
-    print(f"node {self.id} update from {src} received")
-
-    for dest in range(4):
-        via_src_cost = self.costs[src] + packet.mincost[dest]
-        if via_src_cost < self.distance_table[self.id][dest]:
-            self.distance_table[self.id][dest] = via_src_cost
-            updated = True
-            print(f"  updated path to {dest} via {src} with cost {via_src_cost}")
-
-        if packet.mincost[dest] < self.distance_table[src][dest]:
-            self.distance_table[src][dest] = packet.mincost[dest]  # optional backup info
-
-    if updated:
-        print("  changes based on update")
-        self.printdt()
-        self.send_update()
+    entries = packet.delta
+    if self.recompute:
+        if src not in self.neighbors:  # sent before the link went down
+            if self.verbose:
+                print(f"node {self.id} update from {src} ignored, not a neighbor")
+            return
+        if entries is None:
+            self.distance_table.store(src, packet.mincost)
+            improved = self.distance_table.recompute(self.id,
+                                                     self.link_costs())
+        else:
+            entries = self.routes_left_out(src, entries)
+            self.distance_table.store_entries(src, entries)
+            improved = self.distance_table.recompute(
+                self.id, self.link_costs(), [dest for dest, _ in entries])
+    elif entries is None:
+        improved = self.distance_table.relax(self.id, src, self.costs[src],
+                                             packet.mincost)
     else:
-        print(f"  no changes in node {self.id}, so nothing to do")
+        improved = self.distance_table.relax_entries(self.id, src,
+                                                     self.costs[src], entries)
+    if self.verbose:
+        print(f"node {self.id} update from {src} received")
+        next_hop = self.distance_table.next_hop
+        for dest, via_src_cost in improved:
+            print(f"  updated path to {dest} via {next_hop[dest]} with cost {via_src_cost}")
+        if improved:
+            print("  changes based on update")
+        else:
+            print(f"  no changes in node {self.id}, so nothing to do")
         self.printdt()
+    if improved:
+        routes_changed(self.id, self.network)
+    if improved or self.next_hops_moved():
+        self.trigger_update()
 
 def common_link_cost_change(self, to_entity, new_cost):
     """
     React to changes in the network — like a neighbor getting closer or farther.
 
     Updates the cost in the distance table and sends a new distance vector 
-    if the change could affect routing decisions.
+    if the change could affect routing decisions. A link coming up adds a
+    neighbor (with its own table row); a link going down (cost inf) drops it.
+    With recompute on, our whole row is rebuilt from the neighbors' vectors
+    instead of only overwriting the cost to to_entity.
 
     Args:
         to_entity (int): ID of the neighbor whose link cost changed.
         new_cost (int): New cost of the link to that neighbor.
     """
-    print(f"node {self.id}: link cost change to {to_entity} from {self.costs[to_entity]} to {new_cost}")
+    if self.verbose:
+        print(f"node {self.id}: link cost change to {to_entity} from {self.costs[to_entity]} to {new_cost}")
     self.costs[to_entity] = new_cost
-    self.distance_table[self.id][to_entity] = new_cost
-    self.send_update()
+    if new_cost == float('inf'):
+        if to_entity in self.neighbors:
+            self.neighbors.remove(to_entity)
+            self.sent.pop(to_entity, None)
+            self.unrefreshed.discard(to_entity)
+            for key in [key for key in self.left_out if key[0] == to_entity]:
+                del self.left_out[key]
+            if self.recompute:
+                self.distance_table.drop_row(to_entity)
+    elif to_entity not in self.neighbors:
+        self.neighbors.append(to_entity)
+        self.neighbors.sort()
+        self.distance_table.add_row(to_entity)
+    if self.recompute:
+        changed = self.distance_table.recompute(self.id, self.link_costs())
+    else:
+        changed = self.distance_table[self.id][to_entity] != new_cost
+        self.distance_table[self.id][to_entity] = new_cost
+        self.distance_table.next_hop[to_entity] = \
+            None if new_cost == float('inf') else to_entity
+    if changed:
+        routes_changed(self.id, self.network)
+    self.trigger_update()
 
 # ========== Entity Definitions ==========
 
-class Entity0(Entity):
+class DistanceVectorEntity(Entity):
     """
-    Entity 0's view of the network and how it talks to neighbors.
+    A distance vector node for a topology of any size.
 
-    Initializes node ID, costs to neighbors, and triggers distance vector initialization.
-    Handles update and link cost change events using shared logic functions.
+    Neighbors are the nodes with a finite direct cost. Handles update and link
+    cost change events using shared logic functions.
+
+    Args:
+        node (int): this node's id.
+        costs (list): direct link cost to every node (0 to itself, inf when
+            not linked).
+        network: the NetworkSimulator this node sends through (default: the
+            one that is running). Its verbose flag turns our printing off, and
+            its recompute, horizon, hold_down, delta, refresh_every and
+            route_timeout options pick the variant of distance vector we run
+            (see NetworkSimulator).
     """
-    def __init__(self):
-        self.id = 0
-        self.costs = [0, 1, 3, 7]
-        self.neighbors = [1, 2, 3]
+    def __init__(self, node, costs, network=None):
+        self.id = node
+        self.network = network
+        self.verbose = network is None or network.verbose
+        self.recompute = getattr(network, 'recompute', False)
+        self.horizon = getattr(network, 'horizon', 'off')
+        self.hold_down = getattr(network, 'hold_down', 0.0)
+        self.update_pending = False
+        self.delta = getattr(network, 'delta', False)
+        self.refresh_every = getattr(network, 'refresh_every', 100.0)
+        self.sent = {}  # neighbor -> last vector sent (recompute or delta)
+        self.unrefreshed = set()  # neighbors sent deltas since a full vector
+        self.refresh_pending = False
+        self.last_base = None    # our vector at the last delta send_update
+        self.route_timeout = getattr(network, 'route_timeout', 10.0)
+        self.left_out = {}       # (neighbor, dest) -> serial of its expiry
+        self.expiries = []       # (neighbor, dest, serial), in timer order
+        self.expiry_serial = 0
+        self.costs = list(costs)
+        self.neighbors = [dest for dest, cost in enumerate(self.costs)
+                          if dest != node and cost != float('inf')]
         common_init(self)
 
     def update(self, packet):
@@ -110,97 +196,266 @@ class Entity0(Entity):
         """
         common_link_cost_change(self, to_entity, new_cost)
 
-    def send_update(self):
-        """
-        Share latest best guesses with the rest.
+    def mincost(self):
+        """Our current minimum cost to every node, as a list."""
+        return self.distance_table.vector(self.id)
 
-        Extracts the current shortest known cost to each destination and uses
-        to_layer_2() to send this vector to each neighbor.
+    def next_hops_moved(self):
         """
-        mincost = self.distance_table[self.id][:]
-        print(f"sending mincost updates to neighbors")
-        for neighbor in self.neighbors:
-            to_layer_2(self.id, neighbor, mincost)
+        Whether the last recompute moved a route to another neighbor while
+        split horizon or poisoned reverse is on: that changes what we
+        advertise to both neighbors even when no cost changed.
+        """
+        return self.horizon != 'off' and self.distance_table.hops_changed
 
-    def printdt(self):
+    def link_costs(self):
+        """Direct link cost to each neighbor, as {neighbor: cost}."""
+        return {neighbor: self.costs[neighbor] for neighbor in self.neighbors}
+
+    def trigger_update(self):
         """
-        Snapshot our routing table to see how were doing.
+        Our vector changed: send it now, or when the hold-down timer expires.
 
-        Outputs the entire table row-by-row with the node ID for context.
-        Used for visual verification of state during simulation.
+        Every change made while the timer runs goes out in that one send.
         """
-        print(f"node: {self.id}")
-        for row in self.distance_table:
-            print(row)
+        if self.hold_down <= 0:
+            self.send_update()
+        elif not self.update_pending:
+            self.update_pending = True
+            start_timer(self.id, self.hold_down, self.network)
+
+    def hold_down_expired(self):
+        """Send the updates coalesced since trigger_update started the timer."""
+        self.update_pending = False
+        self.send_update()
 
-class Entity1(Entity):
-    def __init__(self):
-        self.id = 1
-        self.costs = [1, 0, 1, float('inf')]
-        self.neighbors = [0, 2]
-        common_init(self)
+    def routes_left_out(self, src, entries):
+        """
+        Start the route timeout for every (dest, None) entry from src.
 
-    def update(self, packet):
-        common_update(self, packet)
+        Split horizon tells a neighbor nothing about the routes we have
+        through it, so to it they are left out, not unreachable: it keeps
+        the cost it last heard until route_timeout passes without us
+        advertising them again. With route_timeout 0 they never expire.
 
-    def link_cost_change(self, to_entity, new_cost):
-        common_link_cost_change(self, to_entity, new_cost)
+        Returns:
+            list: the entries that carry a cost.
+        """
+        left_out = [dest for dest, cost in entries if cost is None]
+        if not left_out and not self.left_out:
+            return entries
+        entries = [(dest, cost) for dest, cost in entries if cost is not None]
+        for dest, _ in entries:
+            self.left_out.pop((src, dest), None)
+        for dest in left_out:
+            if self.verbose:
+                print(f"  {src} no longer advertises a route to {dest}")
+            if self.route_timeout > 0 and (src, dest) not in self.left_out:
+                self.expiry_serial += 1
+                self.left_out[(src, dest)] = self.expiry_serial
+                self.expiries.append((src, dest, self.expiry_serial))
+                start_timer(self.id, self.route_timeout, self.network,
+                            'route')
+        return entries
+
+    def route_expired(self):
+        """
+        The oldest route timeout fired: if that route is still left out,
+        forget the neighbor's cost for it and rebuild our route.
 
-    def send_update(self):
-        mincost = self.distance_table[self.id][:]
-        print(f"sending mincost updates to neighbors")
-        for neighbor in self.neighbors:
-            to_layer_2(self.id, neighbor, mincost)
+        Every timeout has the same delay, so they fire in the order they
+        were started.
+        """
+        src, dest, serial = self.expiries.pop(0)
+        if self.left_out.get((src, dest)) != serial:
+            return  # advertised again, or the link went down
+        del self.left_out[(src, dest)]
+        if self.verbose:
+            print(f"node {self.id}: route to {dest} via {src} timed out")
+        self.distance_table.store_entries(src, [(dest, float('inf'))])
+        changed = self.distance_table.recompute(self.id, self.link_costs(),
+                                                [dest])
+        if self.verbose:
+            self.printdt()
+        if changed:
+            routes_changed(self.id, self.network)
+        if changed or self.next_hops_moved():
+            self.trigger_update()
+
+    def advertisement(self, neighbor, base=None, routed=None):
+        """
+        The vector we tell `neighbor`, as a tuple.
 
-    def printdt(self):
-        print(f"node: {self.id}")
-        for row in self.distance_table:
-            print(row)
+        Routes whose next hop is that neighbor are left out (None) under
+        split horizon and advertised as unreachable (inf) under poisoned
+        reverse. Vectors with entries left out go out as route lists (see
+        send_vector()).
 
-class Entity2(Entity):
-    def __init__(self):
-        self.id = 2
-        self.costs = [3, 1, 0, 2]
-        self.neighbors = [0, 1, 3]
-        common_init(self)
+        Args:
+        neighbor (int): ID of the neighbor the vector is for.
+        base (tuple): our current vector (default: read from the table).
+        routed (list): destinations routed through neighbor (default: read
+            from the table's next hops).
 
-    def update(self, packet):
-        common_update(self, packet)
+        Returns:
+        tuple: `base` itself when nothing is poisoned, so neighbors share it.
+        """
+        if base is None:
+            base = tuple(self.distance_table.vector(self.id))
+        if self.horizon == 'off':
+            return base
+        if routed is None:
+            routed = [dest for dest, hop in enumerate(self.distance_table.next_hop)
+                      if hop == neighbor and dest != neighbor]
+        if not routed:
+            return base
+        vector = list(base)
+        hidden = None if self.horizon == 'split' else float('inf')
+        for dest in routed:
+            vector[dest] = hidden
+        return tuple(vector)
+
+    def send_vector(self, neighbor, vector, last=None):
+        """
+        Send a whole advertisement to `neighbor`.
 
-    def link_cost_change(self, to_entity, new_cost):
-        common_link_cost_change(self, to_entity, new_cost)
+        Under split horizon it goes out as the list of routes we offer, plus
+        (dest, None) for each route offered in `last` (the previous
+        advertisement) that is now left out; otherwise as the vector itself.
+        """
+        if self.horizon != 'split':
+            to_layer_2(self.id, neighbor, vector, self.network)
+            return
+        entries = [(dest, cost) for dest, cost in enumerate(vector)
+                   if cost is not None
+                   or (last is not None and last[dest] is not None)]
+        send_delta(self.id, neighbor, entries, self.network)
 
     def send_update(self):
-        mincost = self.distance_table[self.id][:]
-        print(f"sending mincost updates to neighbors")
+        """
+        Share latest best guesses with the rest.
+
+        Extracts the current shortest known cost to each destination and uses
+        to_layer_2() to send this vector to each neighbor; every neighbor
+        gets the same immutable copy. With recompute on, each neighbor gets
+        its own advertisement() and only when it differs from the last one we
+        sent it. With delta on, see send_deltas().
+        """
+        if self.verbose:
+            print(f"sending mincost updates to neighbors")
+        if self.delta:
+            self.send_deltas()
+            return
+        if not self.recompute:
+            mincost = self.distance_table.snapshot(self.id)
+            for neighbor in self.neighbors:
+                to_layer_2(self.id, neighbor, mincost, self.network)
+            return
+        base, routed = self.routes_by_next_hop()
         for neighbor in self.neighbors:
-            to_layer_2(self.id, neighbor, mincost)
+            vector = self.advertisement(neighbor, base,
+                                        routed.get(neighbor, ()))
+            last = self.sent.get(neighbor)
+            if vector != last:
+                self.sent[neighbor] = vector
+                self.send_vector(neighbor, vector, last)
+
+    def send_deltas(self):
+        """
+        Send each neighbor only the entries that changed since its last update.
+
+        The first update to a neighbor is the full vector. After a delta, a
+        full vector follows refresh_every time units later (see
+        refresh_expired()), so a neighbor that somehow missed a delta still
+        catches up even if nothing changes after it. Without split horizon
+        every neighbor's last vector is the one we had at the previous
+        send_update, so the changed destinations are found once for all of
+        them.
+        """
+        base, routed = self.routes_by_next_hop()
+        changed = None
+        if self.horizon == 'off' and self.last_base is not None:
+            changed = [dest for dest, (cost, old)
+                       in enumerate(zip(base, self.last_base)) if cost != old]
+        self.last_base = base
+        for neighbor in self.neighbors:
+            vector = self.advertisement(neighbor, base,
+                                        routed.get(neighbor, ()))
+            last = self.sent.get(neighbor)
+            self.sent[neighbor] = vector
+            if last is None:
+                self.send_vector(neighbor, vector)
+                continue
+            if changed is not None:
+                entries = [(dest, vector[dest]) for dest in changed]
+            else:
+                entries = [(dest, cost) for dest, (cost, old)
+                           in enumerate(zip(vector, last)) if cost != old]
+            if entries:
+                send_delta(self.id, neighbor, entries, self.network)
+                self.unrefreshed.add(neighbor)
+        if self.unrefreshed and self.refresh_every > 0 \
+                and not self.refresh_pending:
+            self.refresh_pending = True
+            start_timer(self.id, self.refresh_every, self.network, 'refresh')
+
+    def refresh_expired(self):
+        """Send the full vector to every neighbor that got deltas since its
+        last full one."""
+        self.refresh_pending = False
+        base, routed = self.routes_by_next_hop()
+        for neighbor in sorted(self.unrefreshed):
+            vector = self.advertisement(neighbor, base,
+                                        routed.get(neighbor, ()))
+            last = self.sent.get(neighbor)
+            self.sent[neighbor] = vector
+            self.send_vector(neighbor, vector, last)
+        self.unrefreshed.clear()
+
+    def routes_by_next_hop(self):
+        """
+        Our vector, and the destinations we route through each neighbor when
+        split horizon or poisoned reverse needs them.
+
+        Returns:
+        tuple: (our vector as a tuple, {neighbor: [dest, ...]}).
+        """
+        base = tuple(self.distance_table.vector(self.id))
+        routed = {}
+        if self.horizon != 'off':
+            for dest, hop in enumerate(self.distance_table.next_hop):
+                if hop is not None and hop != dest:
+                    routed.setdefault(hop, []).append(dest)
+        return base, routed
 
     def printdt(self):
+        """
+        Snapshot our routing table to see how were doing.
+
+        Outputs the entire table row-by-row with the node ID for context.
+        Used for visual verification of state during simulation.
+        """
         print(f"node: {self.id}")
         for row in self.distance_table:
             print(row)
 
-class Entity3(Entity):
-    def __init__(self):
-        self.id = 3
-        self.costs = [7, float('inf'), 2, 0]
-        self.neighbors = [0, 2]
-        common_init(self)
+class Entity0(DistanceVectorEntity):
+    """
+    Entity 0's view of the network and how it talks to neighbors.
 
-    def update(self, packet):
-        common_update(self, packet)
+    Initializes node ID, costs to neighbors, and triggers distance vector initialization.
+    """
+    def __init__(self, network=None):
+        super().__init__(0, [0, 1, 3, 7], network)
 
-    def link_cost_change(self, to_entity, new_cost):
-        common_link_cost_change(self, to_entity, new_cost)
+class Entity1(DistanceVectorEntity):
+    def __init__(self, network=None):
+        super().__init__(1, [1, 0, 1, float('inf')], network)
 
-    def send_update(self):
-        mincost = self.distance_table[self.id][:]
-        print(f"sending mincost updates to neighbors")
-        for neighbor in self.neighbors:
-            to_layer_2(self.id, neighbor, mincost)
+class Entity2(DistanceVectorEntity):
+    def __init__(self, network=None):
+        super().__init__(2, [3, 1, 0, 2], network)
 
-    def printdt(self):
-        print(f"node: {self.id}")
-        for row in self.distance_table:
-            print(row)
+class Entity3(DistanceVectorEntity):
+    def __init__(self, network=None):
+        super().__init__(3, [7, float('inf'), 2, 0], network)
@@ -7,17 +7,107 @@ https://media.pearsoncmg.com/aw/aw_kurose_network_3/labs/lab6/lab6.html
 """
 
 
-def to_layer_2(sender, receiver, minimum_costs):
+def to_layer_2(sender, receiver, minimum_costs, network=None):
     """
     Send notification from sender to receiver of sender's currently
     known minimum costs to sender to all other nodes.
     :param sender:        sender's node number
     :param receiver:      receiver's node number
     :param minimum_costs: sender's minimum cost to all nodes (a list indexed by
-                          receivers' node numbers)
+                          receivers' node numbers); pass an immutable one
+                          (a tuple) to share it between receivers
+    :param network:       the NetworkSimulator to send through (default: the
+                          one that is running)
     """
     from packet import Packet
     from network_simulator import NetworkSimulator
 
-    p = Packet(sender, receiver, minimum_costs)
-    NetworkSimulator._to_layer_2(p)
+    network = network or NetworkSimulator.active
+    p = Packet(sender, receiver, minimum_costs, network.num_entities)
+    network._to_layer_2(p)
+
+
+def send_delta(sender, receiver, entries, network=None):
+    """
+    Send receiver only some entries of sender's minimum costs: the ones that
+    changed since the last update it got, or under split horizon the routes
+    sender offers it.
+    :param sender:   sender's node number
+    :param receiver: receiver's node number
+    :param entries:  ((destination, cost), ...) in destination order; a cost
+                     of None marks a route split horizon no longer offers
+    :param network:  the NetworkSimulator to send through (default: the one
+                     that is running)
+    """
+    from packet import Packet
+    from network_simulator import NetworkSimulator
+
+    network = network or NetworkSimulator.active
+    p = Packet(sender, receiver, (), network.num_entities,
+               delta=tuple(entries))
+    network._to_layer_2(p)
+
+
+def flood_lsa(sender, receiver, lsa, network=None):
+    """
+    Send a link-state advertisement from sender to its neighbor receiver.
+    :param sender:   sender's node number
+    :param receiver: receiver's node number
+    :param lsa:      (origin, sequence number, ((neighbor, cost), ...))
+    :param network:  the NetworkSimulator to send through (default: the one
+                     that is running)
+    """
+    from packet import Packet
+    from network_simulator import NetworkSimulator
+
+    network = network or NetworkSimulator.active
+    p = Packet(sender, receiver, (), network.num_entities, lsa=lsa)
+    network._to_layer_2(p)
+
+
+def routes_changed(entity, network=None):
+    """
+    Tell the simulator that entity's minimum costs just changed, so it can
+    tell when routing has converged.
+    :param entity:  the node number whose minimum costs changed
+    :param network: the NetworkSimulator the node belongs to (default: the
+                    one that is running)
+    """
+    from network_simulator import NetworkSimulator
+
+    network = network or NetworkSimulator.active
+    network._routes_changed(entity)
+
+
+def start_timer(entity, delay, network=None, timer='hold_down'):
+    """
+    Have entity's hold_down_expired(), route_expired() or refresh_expired()
+    (timer='hold_down', 'route' or 'refresh') called after `delay` time
+    units.
+    :param entity:  the node number whose timer to start
+    :param delay:   how long from now the timer fires
+    :param network: the NetworkSimulator the node belongs to (default: the
+                    one that is running)
+    :param timer:   which of the entity's timers this is
+    """
+    from network_simulator import NetworkSimulator
+
+    network = network or NetworkSimulator.active
+    network._start_timer(entity, delay, timer)
+
+
+def new_distance_table(size, rows, network=None):
+    """
+    Make an empty distance table for one node, stored with the simulator's
+    distance table backend (see distance_table.py).
+    :param size: number of nodes in the network
+    :param rows: node numbers whose rows will be written (the node itself
+                 and its neighbors); every other row stays all infinity
+    :param network: the NetworkSimulator the node belongs to (default: the
+                    one that is running)
+    """
+    from distance_table import DistanceTable
+    from network_simulator import NetworkSimulator
+
+    network = network or NetworkSimulator.active
+    return DistanceTable(size, rows, network.table_backend)
@@ -0,0 +1,429 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Regression checks for the routing simulator.
+:Author: Randy Rizo
+:Version: s25
+
+Run with python3 -m unittest (or pytest) from the p3-2 folder.
+"""
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from array import array
+
+from binary_trace import (CHANGE, DELIVER, ROW, SEND, TraceReader,
+                          TraceWriter)
+from distance_table import available_backends
+from event import Event, FROM_LAYER_2, LINK_CHANGE
+from event_list import EventList
+from metrics import RunMetrics, count_wrong_routes
+from network_simulator import NetworkSimulator
+from topology import Topology
+
+INF = float('inf')
+
+
+def trace(topology=None, has_change=True, seed=1, backend='list', **options):
+    """Everything a verbose run prints, as one string."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        NetworkSimulator(topology, has_change, 2, seed, backend,
+                         **options).run()
+    return out.getvalue()
+
+
+def random_topology(nodes, seed):
+    """A random topology with link changes, including one link going down
+    (without cutting the network in two) and coming back up."""
+    topology = Topology.random(nodes, degree=3, num_changes=3, seed=seed)
+    for neighbor in topology.neighbors(0):
+        cut = topology.copy()
+        cut.set_cost(0, neighbor, INF)
+        if INF not in cut.shortest_paths(0):
+            break
+    topology.add_change(35000, 0, neighbor, INF)
+    topology.add_change(45000, 0, neighbor, 4)
+    return topology
+
+
+class BackendTraceTest(unittest.TestCase):
+    """Every table backend prints the same trace as the list backend."""
+
+    def check_backend(self, backend, configs):
+        for topology in (None, random_topology(12, 3)):
+            for options in configs:
+                for seed in (3, 7):
+                    self.assertEqual(
+                        trace(topology, seed=seed, backend=backend, **options),
+                        trace(topology, seed=seed, **options),
+                        '{} {} seed {}'.format(backend, options, seed))
+
+    @unittest.skipUnless('numpy' in available_backends(), 'needs NumPy')
+    def test_numpy(self):
+        self.check_backend('numpy', [{}, {'horizon': 'poison'},
+                                     {'horizon': 'split'},
+                                     {'recompute': True, 'delta': True},
+                                     {'horizon': 'poison', 'delta': True},
+                                     {'delta': True}])
+
+
+class LinearEventList(object):
+    """The original EventList: a linear scan for the earliest event (the first
+    added wins a tie) and for the last pending arrival on a link."""
+
+    def __init__(self):
+        self.data = []
+
+    def add(self, event):
+        self.data.append(event)
+
+    def last_packet_time(self, entity_from, entity_to):
+        time = 0.0
+        for event in self.data:
+            if (event.type == FROM_LAYER_2 and event.entity == entity_to
+                    and event.packet.src == entity_from):
+                time = event.time
+        return time
+
+    def remove_next(self):
+        if not self.data:
+            return None
+        first = min(range(len(self.data)), key=lambda i: self.data[i].time)
+        return self.data.pop(first)
+
+
+class LinearNetwork(NetworkSimulator):
+    def __init__(self, *args, **options):
+        super().__init__(*args, **options)
+        self.event_list = LinearEventList()
+
+
+class Arrival(object):
+    def __init__(self, src):
+        self.src = src
+
+
+class EventListTest(unittest.TestCase):
+    """The heap-based EventList behaves exactly like the original scan."""
+
+    def test_matches_the_linear_scan(self):
+        rng = random.Random(5)
+        heap, linear = EventList(), LinearEventList()
+        clock = 0.0
+        for _ in range(2000):
+            if rng.random() < 0.55 or not len(heap):
+                # few distinct times, so ties are common; arrivals on a link
+                # never precede the link's previous arrival, as in the
+                # simulator
+                src, dest = rng.randrange(3), rng.randrange(3)
+                if rng.random() < 0.8:
+                    time = max(clock, linear.last_packet_time(src, dest)) \
+                        + rng.choice((0, 0, 1, 2))
+                    event = Event(time, FROM_LAYER_2, dest, Arrival(src))
+                else:
+                    event = Event(clock + rng.choice((0, 1)), LINK_CHANGE, src)
+                heap.add(event)
+                linear.add(event)
+            else:
+                event = heap.remove_next()
+                self.assertIs(event, linear.remove_next())
+                clock = event.time
+            for src in range(3):
+                for dest in range(3):
+                    self.assertEqual(heap.last_packet_time(src, dest),
+                                     linear.last_packet_time(src, dest))
+
+    def test_last_arrival_popped(self):
+        events = EventList()
+        first = Event(5.0, FROM_LAYER_2, 1, Arrival(0))
+        last = Event(5.0, FROM_LAYER_2, 1, Arrival(0))
+        events.add(first)
+        events.add(last)
+        self.assertIs(events.remove_next(), first)   # ties: first added
+        self.assertEqual(events.last_packet_time(0, 1), 5.0)
+        self.assertIs(events.remove_next(), last)
+        self.assertEqual(events.last_packet_time(0, 1), 0.0)
+        self.assertIsNone(events.remove_next())
+
+    def test_same_trace_as_the_linear_scan(self):
+        for topology in (None, random_topology(12, 3)):
+            for seed in (1, 42, 777):
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    LinearNetwork(topology, True, 2, seed).run()
+                self.assertEqual(trace(topology, seed=seed), out.getvalue())
+
+
+def count_to_infinity():
+    """The Kurose/Ross example: x=0, y=1, z=2, and x-y rises from 4 to 60,
+    so without a horizon y and z count up to x's new cost together."""
+    topology = Topology(3)
+    topology.set_cost(0, 1, 4)
+    topology.set_cost(1, 2, 1)
+    topology.set_cost(0, 2, 50)
+    topology.add_change(10000, 0, 1, 60)
+    return topology
+
+
+def run(topology, seed=1, **options):
+    return NetworkSimulator(topology, True, 0, seed, verbose=False,
+                            check=True, **options).run()
+
+
+class HorizonTest(unittest.TestCase):
+    def test_horizon_stops_count_to_infinity(self):
+        off = run(count_to_infinity(), recompute=True).metrics.epochs[-1]
+        for horizon in ('split', 'poison'):
+            sim = run(count_to_infinity(), horizon=horizon)
+            epoch = sim.metrics.epochs[-1]
+            self.assertTrue(epoch['correct'], horizon)
+            self.assertLess(epoch['messages'] * 5, off['messages'], horizon)
+
+    def test_split_leaves_routes_out_and_poison_sends_inf(self):
+        split = trace(count_to_infinity(), horizon='split')
+        poison = trace(count_to_infinity(), horizon='poison')
+        self.assertNotEqual(split, poison)
+        self.assertIn('no longer advertises', split)
+        self.assertIn('inf', poison)
+        self.assertNotIn('mincost=', split)
+
+    def test_split_keeps_left_out_routes_until_they_time_out(self):
+        # z routes to x through y, so y's cost for x must not come back from
+        # z; without a route timeout z keeps the 4 y told it before the rise
+        stale = run(count_to_infinity(), horizon='split', route_timeout=0)
+        self.assertEqual(stale.final_tables()[2][0], 5)
+        self.assertFalse(stale.summary()['correct'])
+        timed_out = run(count_to_infinity(), horizon='split')
+        self.assertEqual(timed_out.final_tables()[2][0], 50)
+        self.assertTrue(timed_out.summary()['correct'])
+
+    def test_horizon_converges_sooner_with_fewer_messages(self):
+        def totals(**options):
+            summaries = [run(random_topology(25, seed), seed, **options)
+                         .summary() for seed in range(1, 6)]
+            return (sum(s['convergence_time'] for s in summaries),
+                    sum(s['messages'] for s in summaries))
+        off_time, off_messages = totals(recompute=True)
+        for horizon in ('split', 'poison'):
+            time, messages = totals(horizon=horizon)
+            self.assertLess(time, off_time, horizon)
+            self.assertLess(messages, off_messages, horizon)
+
+    def test_random_topologies_match_the_oracle(self):
+        for seed in (1, 2, 3):
+            topology = random_topology(25, seed)
+            for options in ({'horizon': 'split'}, {'horizon': 'poison'},
+                            {'horizon': 'split', 'hold_down': 5.0}):
+                self.assertTrue(run(topology, seed, **options)
+                                .summary()['correct'], (seed, options))
+
+
+class MetricsTest(unittest.TestCase):
+    def test_count_wrong_routes(self):
+        oracle = [[0, 1, 3], [1, 0, 2], [3, 2, 0]]
+        self.assertEqual(count_wrong_routes(oracle, oracle), 0)
+        self.assertEqual(count_wrong_routes(
+            [[0, 1, 4], [1, 0, 2], [INF, 2, 0]], oracle), 2)
+
+    def test_epochs_split_at_link_changes(self):
+        metrics = RunMetrics(3)
+        metrics.sent(0, 40)
+        metrics.route_changed(3.0)
+        topology = count_to_infinity()
+        first = metrics.end_epoch(10.0, topology.all_pairs(), topology)
+        metrics.sent(1, 40)
+        metrics.sent(2, 40)
+        second = metrics.end_epoch(25.0)
+        self.assertEqual((first['messages'], first['convergence_time'],
+                          first['correct']), (1, 3.0, True))
+        # nothing changed in the second epoch: converged the moment it began
+        self.assertEqual((second['start'], second['convergence_time'],
+                          second['bytes'], second['correct']),
+                         (10.0, 0.0, 80, None))
+        self.assertEqual(metrics.to_dict()['messages'], 3)
+        self.assertTrue(metrics.to_dict()['correct'])
+
+    def test_each_epoch_is_checked_against_the_oracle(self):
+        topology = random_topology(12, 3)
+        sim = run(topology, recompute=True)
+        self.assertEqual(len(sim.metrics.epochs), len(topology.changes) + 1)
+        self.assertTrue(all(epoch['correct'] for epoch in sim.metrics.epochs))
+        # split horizon without a route timeout leaves z a stale route to x
+        # once x-y rises, so only the epoch after the change is wrong
+        stale = run(count_to_infinity(), horizon='split', route_timeout=0)
+        self.assertEqual([(e['correct'], e['wrong_routes'])
+                          for e in stale.metrics.epochs],
+                         [(True, 0), (False, 1)])
+
+
+class LinkStateTest(unittest.TestCase):
+    def test_matches_the_oracle_and_distance_vector(self):
+        for seed in (1, 2, 3):
+            topology = random_topology(25, seed)
+            ls = run(topology, seed, engine='ls')
+            self.assertTrue(all(epoch['correct']
+                                for epoch in ls.metrics.epochs), seed)
+            self.assertEqual(ls.final_tables(),
+                             run(topology, seed, horizon='poison')
+                             .final_tables())
+            # a link going down reruns Dijkstra; start-up and the link
+            # coming back up only lower costs, so they relax incrementally
+            self.assertTrue(all(entity.spf_full for entity in ls.entities))
+            self.assertTrue(any(entity.spf_incremental
+                                for entity in ls.entities))
+
+    def test_partition_and_repair(self):
+        # x is cut off at 30000 (distance vector would count to infinity
+        # here) and comes back through z at 40000
+        topology = count_to_infinity()
+        topology.add_change(20000, 0, 2, INF)
+        topology.add_change(30000, 0, 1, INF)
+        topology.add_change(40000, 0, 2, 3)
+        sim = run(topology, engine='ls')
+        self.assertEqual([epoch['correct'] for epoch in sim.metrics.epochs],
+                         [True] * 5)
+        self.assertEqual(sim.final_tables(),
+                         [[0, 4, 3], [4, 0, 1], [3, 1, 0]])
+
+    @unittest.skipUnless('numpy' in available_backends(), 'needs NumPy')
+    def test_numpy_backend_prints_the_same_trace(self):
+        topology = random_topology(12, 3)
+        self.assertEqual(trace(topology, engine='ls', backend='numpy'),
+                         trace(topology, engine='ls'))
+
+
+class RecordedNetwork(NetworkSimulator):
+    """Records a binary trace, and before every event counts the nodes whose
+    latest ROW record is not their current vector."""
+
+    def __init__(self, *args, **options):
+        self.directory = tempfile.TemporaryDirectory()
+        super().__init__(*args, verbose=False, check=True,
+                         record=os.path.join(self.directory.name, 'run.dvt'),
+                         **options)
+        self.unrecorded = 0
+        remove_next = self.event_list.remove_next
+
+        def checked_remove_next():
+            for node, entity in enumerate(self.entities):
+                if self.recorder._last_rows.get(node) != \
+                        array('d', entity.mincost()).tobytes():
+                    self.unrecorded += 1
+            return remove_next()
+        self.event_list.remove_next = checked_remove_next
+
+
+class BinaryTraceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'run.dvt')
+
+    def test_round_trip(self):
+        writer = TraceWriter(self.path, 3, buffer_size=64)
+        writer.row(0.0, 0, [0, 4, INF])
+        writer.send(0.0, 0, 1, 1.5)
+        writer.deliver(1.5, 0, 1)
+        writer.row(1.5, 1, [4, 0, 1])
+        writer.row(1.5, 1, [4, 0, 1])      # unchanged: not recorded again
+        writer.change(10.0, 0, 2, 2.5)
+        writer.close()
+        self.assertEqual(writer.records, 5)
+        self.assertEqual(list(TraceReader(self.path)), [
+            (ROW, 0.0, 0, [0.0, 4.0, INF]),
+            (SEND, 0.0, 0, 1, 1.5),
+            (DELIVER, 1.5, 0, 1),
+            (ROW, 1.5, 1, [4.0, 0.0, 1.0]),
+            (CHANGE, 10.0, 0, 2, 2.5)])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a trace at all')
+        with self.assertRaises(ValueError):
+            TraceReader(self.path)
+
+    def test_events_filters(self):
+        sim = NetworkSimulator(None, True, 0, 1, verbose=False,
+                               record=self.path).run()
+        reader = TraceReader(self.path)
+        records = list(reader)
+        self.assertEqual(sum(r[0] == DELIVER for r in records), sim.messages)
+        changes = list(reader.events(kinds=(CHANGE,)))
+        self.assertEqual([r[1:] for r in changes],
+                         [(10000.0, 0, 1, 20.0), (20000.0, 0, 1, 1.0)])
+        window = list(reader.events(start=10000.0, end=20000.0))
+        self.assertTrue(window)
+        self.assertTrue(all(10000.0 <= r[1] <= 20000.0 for r in window))
+        self.assertEqual(window, [r for r in records
+                                  if 10000.0 <= r[1] <= 20000.0])
+        for record in reader.events(node=3):
+            self.assertIn(3, record[2:3] if record[0] == ROW
+                          else record[2:4])
+        self.assertEqual(len(list(reader.events(node=3))), sum(
+            3 in (r[2:3] if r[0] == ROW else r[2:4]) for r in records))
+
+    def test_table_at(self):
+        topology = random_topology(12, 3)
+        sim = NetworkSimulator(topology, True, 0, 3, verbose=False,
+                               record=self.path).run()
+        reader = TraceReader(self.path)
+        self.assertEqual(reader.table_at(),
+                         dict(enumerate(sim.final_tables())))
+        # just before the first change the oracle's costs hold
+        before = NetworkSimulator(topology, False, 0, 3, verbose=False).run()
+        self.assertEqual(reader.table_at(topology.changes[0][0] - 1),
+                         dict(enumerate(before.final_tables())))
+
+    def test_timer_route_changes_are_recorded(self):
+        # route_expired() changes routes from a TIMER event
+        for seed in (1, 2, 3):
+            sim = RecordedNetwork(random_topology(25, seed), True, 0, seed,
+                                  horizon='split').run()
+            self.assertEqual(sim.unrecorded, 0, seed)
+            sim.directory.cleanup()
+
+
+class LossyNetwork(NetworkSimulator):
+    """Drops every delta update sent at or after `start` until `count` of
+    them are gone, as if they were lost on the wire."""
+
+    def __init__(self, *args, start=0.0, count=0, **options):
+        super().__init__(*args, **options)
+        self.start, self.count = start, count
+
+    def _to_layer_2(self, p):
+        if p.delta is not None and self.time >= self.start and self.count:
+            self.count -= 1
+            return
+        super()._to_layer_2(p)
+
+
+class DeltaTest(unittest.TestCase):
+    def test_delta_routes_equal_full_vector_routes(self):
+        for seed in (1, 2, 3):
+            topology = random_topology(25, seed)
+            for options in ({'recompute': True}, {'horizon': 'poison'},
+                            {'horizon': 'split'}):
+                full = run(topology, seed, **options)
+                delta = run(topology, seed, delta=True, **options)
+                self.assertEqual(delta.final_tables(), full.final_tables())
+                self.assertTrue(delta.summary()['correct'], (seed, options))
+                self.assertLess(delta.summary()['bytes'],
+                                full.summary()['bytes'])
+
+    def test_refresh_repairs_a_lost_delta(self):
+        topology = random_topology(25, 1)
+        for refresh_every, repaired in ((100.0, True), (0, False)):
+            sim = LossyNetwork(topology, True, 0, 1, verbose=False,
+                               check=True, recompute=True, delta=True,
+                               refresh_every=refresh_every, start=20000.0,
+                               count=5).run()
+            self.assertEqual(sim.summary()['correct'], repaired,
+                             refresh_every)
+
+
+if __name__ == '__main__':
+    unittest.main()
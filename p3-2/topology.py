@@ -0,0 +1,228 @@
+"""
+CPSC 5510, Seattle University, Project #3
+Network topologies for the distance vector simulator.
+:Author: Randy Rizo
+:Version: s25
+
+A Topology is N nodes, symmetric link costs and a schedule of link-cost
+changes. Links are stored as one {neighbor: cost} dict per node, so memory
+grows with the number of links rather than N^2.
+
+Topologies come from:
+  - the built-in 4-node network of the original lab (Topology.default())
+  - an edge-list text file, one statement per line:
+        nodes 5              (optional; otherwise 1 + the largest node id)
+        0 1 3                (link 0 <-> 1 with cost 3)
+        change 10000 0 1 20  (at t=10000 the 0 <-> 1 link cost becomes 20)
+    blank lines and anything after '#' are ignored, and 'inf' is accepted
+    as a cost (link down)
+  - a JSON file: {"nodes": 5, "links": [[0, 1, 3], ...],
+                  "changes": [[10000, 0, 1, 20], ...]}
+  - a random connected graph (Topology.random())
+"""
+import heapq
+import json
+import random
+
+INF = float('inf')
+
+
+class Topology(object):
+    """N nodes, symmetric link costs and a schedule of link-cost changes."""
+
+    def __init__(self, num_nodes):
+        if num_nodes < 2:
+            raise ValueError('a topology needs at least 2 nodes')
+        self.num_nodes = num_nodes
+        self.links = [{} for _ in range(num_nodes)]
+        self.changes = []
+
+    def __str__(self):
+        return 'Topology({} nodes, {} links, {} changes)'.format(
+            self.num_nodes, self.num_links(), len(self.changes))
+
+    def _check(self, node):
+        if not 0 <= node < self.num_nodes:
+            raise ValueError('node {} is not in 0..{}'.format(
+                node, self.num_nodes - 1))
+
+    def num_links(self):
+        return sum(len(neighbors) for neighbors in self.links) // 2
+
+    def cost(self, u, v):
+        """Direct link cost from u to v (0 to itself, INF if not linked)."""
+        if u == v:
+            return 0
+        return self.links[u].get(v, INF)
+
+    def set_cost(self, u, v, cost):
+        """Set the symmetric u <-> v link cost; INF removes the link."""
+        self._check(u)
+        self._check(v)
+        if u == v:
+            raise ValueError('a link needs two different nodes')
+        if cost == INF:
+            self.links[u].pop(v, None)
+            self.links[v].pop(u, None)
+        else:
+            self.links[u][v] = cost
+            self.links[v][u] = cost
+
+    add_link = set_cost
+
+    def neighbors(self, u):
+        return sorted(self.links[u])
+
+    def cost_vector(self, u):
+        """Costs from u to every node: the initial `costs` of an entity."""
+        return [self.cost(u, v) for v in range(self.num_nodes)]
+
+    def copy(self):
+        """An independent copy (simulations change link costs as they run)."""
+        topology = Topology(self.num_nodes)
+        topology.links = [dict(neighbors) for neighbors in self.links]
+        topology.changes = list(self.changes)
+        return topology
+
+    def add_change(self, time, u, v, cost):
+        """Schedule the u <-> v link cost to become `cost` at `time`."""
+        self._check(u)
+        self._check(v)
+        self.changes.append((float(time), u, v, cost))
+        self.changes.sort(key=lambda change: change[0])
+
+    def shortest_paths(self, source):
+        """Least cost from source to every node (Dijkstra)."""
+        dist = [INF] * self.num_nodes
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            cost, u = heapq.heappop(heap)
+            if cost > dist[u]:
+                continue
+            for v, link_cost in self.links[u].items():
+                if cost + link_cost < dist[v]:
+                    dist[v] = cost + link_cost
+                    heapq.heappush(heap, (dist[v], v))
+        return dist
+
+    def all_pairs(self):
+        """shortest_paths() from every node: the routing-correctness oracle."""
+        return [self.shortest_paths(u) for u in range(self.num_nodes)]
+
+    @classmethod
+    def from_matrix(cls, matrix, changes=()):
+        """Build from a full cost matrix (INF for no link) and change tuples."""
+        topology = cls(len(matrix))
+        for u, row in enumerate(matrix):
+            for v, cost in enumerate(row):
+                if u < v and cost != INF:
+                    topology.set_cost(u, v, cost)
+        for change in changes:
+            topology.add_change(*change)
+        return topology
+
+    @classmethod
+    def default(cls):
+        """The 4-node network and link changes hard-coded in the original lab."""
+        return cls.from_matrix(
+            [[0, 1, 3, 7], [1, 0, 1, INF], [3, 1, 0, 2], [7, INF, 2, 0]],
+            [(10000.0, 0, 1, 20), (20000.0, 0, 1, 1)])
+
+    @classmethod
+    def from_dict(cls, data):
+        links = [tuple(link) for link in data.get('links', [])]
+        num_nodes = data.get('nodes')
+        if num_nodes is None:
+            num_nodes = 1 + max(max(u, v) for u, v, _ in links)
+        topology = cls(num_nodes)
+        for u, v, cost in links:
+            topology.set_cost(u, v, _cost(cost))
+        for time, u, v, cost in data.get('changes', []):
+            topology.add_change(time, u, v, _cost(cost))
+        return topology
+
+    def to_dict(self):
+        return {
+            'nodes': self.num_nodes,
+            'links': [[u, v, cost] for u in range(self.num_nodes)
+                      for v, cost in sorted(self.links[u].items()) if u < v],
+            'changes': [[time, u, v, 'inf' if cost == INF else cost]
+                        for time, u, v, cost in self.changes],
+        }
+
+    @classmethod
+    def from_edge_list(cls, lines):
+        num_nodes = None
+        links = []
+        changes = []
+        for number, line in enumerate(lines, 1):
+            fields = line.split('#', 1)[0].split()
+            try:
+                if not fields:
+                    continue
+                if fields[0] == 'nodes' and len(fields) == 2:
+                    num_nodes = int(fields[1])
+                elif fields[0] == 'change' and len(fields) == 5:
+                    changes.append((float(fields[1]), int(fields[2]),
+                                    int(fields[3]), _cost(fields[4])))
+                elif len(fields) == 3:
+                    links.append((int(fields[0]), int(fields[1]),
+                                  _cost(fields[2])))
+                else:
+                    raise ValueError('unrecognized statement')
+            except ValueError as e:
+                raise ValueError('line {}: {!r}: {}'.format(
+                    number, line.strip(), e))
+        return cls.from_dict({'nodes': num_nodes, 'links': links,
+                              'changes': changes})
+
+    @classmethod
+    def load(cls, path):
+        """Load a .json topology, or an edge-list file for any other name."""
+        with open(path) as f:
+            if path.endswith('.json'):
+                return cls.from_dict(json.load(f))
+            return cls.from_edge_list(f)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def random(cls, num_nodes, degree=3, max_cost=10, num_changes=0,
+               change_interval=10000.0, seed=None):
+        """A random connected graph.
+
+        A random spanning tree guarantees connectivity; extra random links
+        are added until the average degree reaches `degree`. Link costs are
+        uniform in 1..max_cost. `num_changes` link-cost changes on existing
+        links are scheduled every `change_interval` time units.
+        """
+        rng = random.Random(seed)
+        topology = cls(num_nodes)
+        for v in range(1, num_nodes):
+            topology.set_cost(rng.randrange(v), v, rng.randint(1, max_cost))
+        target = min(num_nodes * degree // 2,
+                     num_nodes * (num_nodes - 1) // 2)
+        while topology.num_links() < target:
+            u, v = rng.randrange(num_nodes), rng.randrange(num_nodes)
+            if u != v and v not in topology.links[u]:
+                topology.set_cost(u, v, rng.randint(1, max_cost))
+        for i in range(num_changes):
+            u = rng.randrange(num_nodes)
+            v = rng.choice(topology.neighbors(u))
+            topology.add_change(change_interval * (i + 1), u, v,
+                                rng.randint(1, max_cost * 2))
+        return topology
+
+
+def _cost(value):
+    """Parse a link cost: an int when possible, 'inf' for no link."""
+    if isinstance(value, str):
+        if value.lower() in ('inf', 'infinity'):
+            return INF
+        value = float(value)
+    if value != INF and value == int(value):
+        return int(value)
+    return value
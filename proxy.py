@@ -1,5 +1,10 @@
 import sys
+import os
+import argparse                    # command line options
+import queue                       # bounded queue of accepted connections
 import socket                      #create socket 
+import threading                   # worker pool and per-host counters
+import time                        # token bucket clock
 from urllib.parse import urlparse #to parse absolute URI
 from pathlib import Path           # create cache folder 
 
@@ -7,6 +12,12 @@ from pathlib import Path           # create cache folder
 @Purpose: This program implements a basic web proxy server that handles simple GET requests for HTML files.
           It includes a file-based caching mechanism to reduce repeated server calls for previously fetched pages.
           The proxy listens for one request per execution, and handles malformed requests gracefully.
+          With --serve it keeps accepting connections and hands them to a pool of worker threads
+          through a bounded queue. Load is shed fast instead of piling up:
+            - a full queue answers 503 Service Unavailable right away
+            - a client over its concurrency cap or token-bucket rate answers 429 Too Many Requests
+            - an origin over its concurrency cap or token-bucket rate answers 503 (cache hits
+              never touch the origin, so they are not limited)
 
 @Author: Randy Rizo 
 @Course: CPSC5510 - Computer Networks
@@ -14,13 +25,113 @@ from pathlib import Path           # create cache folder
 @Version: 1.0
 """
 
+class TokenBucket:
+    """@Purpose: token-bucket rate limit, refilled at `rate` tokens per second up to `burst`.
+       A rate of 0 means unlimited. """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """@Purpose: take one token; False if the bucket is empty. """
+        if not self.rate:
+            return True
+        with self.lock:
+            self.refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def full(self):
+        """@Purpose: True once the bucket has refilled to `burst`, i.e. it would admit the same
+           burst as a brand new bucket and can be dropped. """
+        if not self.rate:
+            return True
+        with self.lock:
+            self.refill()
+            return self.tokens >= self.burst
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+
+class HostLimiter:
+    """@Purpose: per-host (client address or origin) concurrency cap plus a token bucket
+       for each host. A cap or rate of 0 means unlimited.
+       Only hosts with requests in progress or a bucket that has not refilled yet are kept:
+       release() drops a host's bucket once it is idle and full, and acquire() sweeps such
+       buckets whenever their number doubles, so the tables stay bounded by recent traffic. """
+
+    def __init__(self, max_active, rate, burst):
+        self.max_active = max_active
+        self.rate = rate
+        self.burst = burst
+        self.active = {}   # host -> requests in progress (or queued)
+        self.buckets = {}  # host -> TokenBucket, only when rate is set
+        self.sweep_at = 64  # sweep idle buckets once there are this many
+        self.lock = threading.Lock()
+
+    def acquire(self, host):
+        """@Purpose: admit one request for host; returns None if admitted, otherwise the reason
+           ("busy" over the concurrency cap, "rate" over the rate limit). A request that was
+           admitted must be released. """
+        with self.lock:
+            if self.max_active and self.active.get(host, 0) >= self.max_active:
+                return "busy"
+            if self.rate:
+                bucket = self.buckets.get(host)
+                if bucket is None:
+                    if len(self.buckets) >= self.sweep_at:
+                        self.sweep()
+                    bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+                if not bucket.take():
+                    return "rate"
+            self.active[host] = self.active.get(host, 0) + 1
+            return None
+
+    def release(self, host):
+        with self.lock:
+            left = self.active.get(host, 0) - 1
+            if left > 0:
+                self.active[host] = left
+                return
+            self.active.pop(host, None)
+            bucket = self.buckets.get(host)
+            if bucket is not None and bucket.full():
+                del self.buckets[host]
+
+    def sweep(self):
+        """@Purpose: drop the buckets of idle hosts that have refilled; called with the lock
+           held. """
+        for host, bucket in list(self.buckets.items()):
+            if host not in self.active and bucket.full():
+                del self.buckets[host]
+        self.sweep_at = max(64, 2 * len(self.buckets))
+
+
 """ @Purpose: create proxy class and constructor
  """
 
 class Proxy:
-    def __init__(self, port):
+    def __init__(self, port, workers=8, queue_size=32, client_limit=4, origin_limit=4,
+                 client_rate=0.0, origin_rate=0.0, burst=10, timeout=10.0):
         self.port = port
         self.cache_dir = Path("cache")
+        # used by serve() only; start() handles a single request as before
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.clients = HostLimiter(client_limit, client_rate, burst)
+        self.origins = HostLimiter(origin_limit, origin_rate, burst)
+        # set once serve() is listening; with port 0, self.port is then the one it got
+        self.listening = threading.Event()
 
         """@Purpose: start socket listener and listen for requests. """
 
@@ -44,6 +155,77 @@ class Proxy:
 
         print("All done! Closing socket...")
 
+    def serve(self):
+        """@Purpose: accept connections until interrupted and hand them to the worker pool.
+           The accept loop only ever does cheap work, so rejections stay fast under load. """
+        pending = queue.Queue(self.queue_size)
+        for _ in range(self.workers):
+            threading.Thread(target=self.worker, args=(pending,), daemon=True).start()
+
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(("0.0.0.0", self.port))
+            listener.listen(max(self.queue_size, 1))
+            self.port = listener.getsockname()[1]
+            self.listening.set()
+            print(f"\n **** Serving on port {self.port} with {self.workers} workers ****")
+            try:
+                while True:
+                    conn, addr = listener.accept()
+                    client = addr[0]
+                    refused = self.clients.acquire(client)
+                    if refused:
+                        print(f"Client {client} is over its {refused} limit, 429")
+                        self.reject(conn, 429, "Too Many Requests")
+                        continue
+                    try:
+                        pending.put_nowait((conn, client))
+                    except queue.Full:
+                        self.clients.release(client)
+                        print(f"Queue full, shedding {client} with 503")
+                        self.reject(conn, 503, "Service Unavailable")
+            except KeyboardInterrupt:
+                pass
+
+        print("All done! Closing socket...")
+
+    def worker(self, pending):
+        """@Purpose: handle queued client connections one at a time. """
+        while True:
+            conn, client = pending.get()
+            try:
+                with conn:
+                    conn.settimeout(self.timeout)
+                    self.handle_client(conn)
+            except Exception as e:
+                print(f"!!!Error handling {client}: {e}!!!")
+            finally:
+                self.clients.release(client)
+
+    def reject(self, conn, code, reason):
+        """@Purpose: answer with an error status and close, without reading the request. """
+        body = f"<html><body><h1>{code} {reason}</h1></body></html>"
+        response = (
+            f"HTTP/1.1 {code} {reason}\r\n"
+            f"Retry-After: 1\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Content-Type: text/html\r\n"
+            f"Cache-Hit: 0\r\n"
+            f"Connection: close\r\n\r\n"
+            f"{body}"
+        )
+        try:
+            conn.sendall(response.encode())
+            conn.shutdown(socket.SHUT_WR)
+            # discard the request if it already arrived: closing with unread data
+            # resets the connection, and the client may lose our response
+            conn.setblocking(False)
+            conn.recv(65536)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
         """@Purpose: handle client HTTP request """
         
 
@@ -84,7 +266,16 @@ class Proxy:
             self.serve_from_cache(conn, cache_path)
         else:
             print("Oops! No cache hit! Requesting origin server for the file...")
-            self.fetch_and_cache(conn, host, port, path, cache_path)
+            origin = (host, port)
+            refused = self.origins.acquire(origin)
+            if refused:
+                print(f"Origin {host}:{port} is over its {refused} limit, 503")
+                self.reject(conn, 503, "Service Unavailable")
+                return
+            try:
+                self.fetch_and_cache(conn, host, port, path, cache_path)
+            finally:
+                self.origins.release(origin)
 
         print("Now responding to the client...")
 
@@ -109,8 +300,7 @@ class Proxy:
         """@Purpose; Send all from socket to server and cache if no cache hit and status code 200 """
 
     def fetch_and_cache(self, conn, host, port, path, cache_path):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-            server_socket.connect((host, port))
+        with socket.create_connection((host, port), timeout=self.timeout) as server_socket:
 
             request = (
                 f"GET {path} HTTP/1.1\r\n"
@@ -135,8 +325,11 @@ class Proxy:
 
         if "200 OK" in status_line:
             print("Response received from server, and status code is 200! Write to cache, save time next time...")
-            with open(cache_path, "wb") as f:
+            # write then rename, so a worker serving the same file never reads half of it
+            part_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.part")
+            with open(part_path, "wb") as f:
                 f.write(body)
+            os.replace(part_path, cache_path)
             conn.sendall(response)
         elif "404" in status_line:
             print("Response received from server, status 404! NOT FOUND ")
@@ -153,15 +346,36 @@ class Proxy:
             conn.sendall(header_part + b"\r\nCache-Hit: 0\r\n\r\n" + body)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 proxy.py <PORT>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(usage="python3 proxy.py <PORT> [--serve ...]")
+    parser.add_argument("port")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep serving requests with a worker pool")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue", type=int, default=32,
+                        help="connections waiting for a worker before 503s")
+    parser.add_argument("--client-limit", type=int, default=4,
+                        help="requests in progress per client (0: no cap)")
+    parser.add_argument("--origin-limit", type=int, default=4,
+                        help="fetches in progress per origin (0: no cap)")
+    parser.add_argument("--client-rate", type=float, default=0.0,
+                        help="requests per second per client (0: no limit)")
+    parser.add_argument("--origin-rate", type=float, default=0.0,
+                        help="fetches per second per origin (0: no limit)")
+    parser.add_argument("--burst", type=int, default=10,
+                        help="token bucket size for the rate limits")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="socket timeout in seconds")
+    args = parser.parse_args()
 
     try:
-        port = int(sys.argv[1])
+        port = int(args.port)
     except ValueError:
         print("Port must be an integer.")
         sys.exit(1)
 
-    proxy = Proxy(port)
-    proxy.start()
+    proxy = Proxy(port, args.workers, args.queue, args.client_limit, args.origin_limit,
+                  args.client_rate, args.origin_rate, args.burst, args.timeout)
+    if args.serve:
+        proxy.serve()
+    else:
+        proxy.start()
@@ -0,0 +1,179 @@
+"""
+@Purpose: Regression checks for the proxy's per-host admission limits and
+the fast rejections serve() answers with under load.
+Run with python3 -m unittest (or pytest) from this folder.
+
+@Author: Randy Rizo
+@Course: CPSC5510
+@Date: 2026-10-19
+@Version: 1.0
+"""
+import contextlib
+import io
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from proxy import HostLimiter, Proxy, TokenBucket
+
+
+def age(bucket, seconds):
+    """Pretend `seconds` went by since the bucket was last refilled."""
+    bucket.stamp -= seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=3)
+        self.assertEqual([bucket.take() for _ in range(4)],
+                         [True, True, True, False])
+        self.assertFalse(bucket.full())
+        age(bucket, 0.5)
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take())
+        age(bucket, 10.0)
+        self.assertTrue(bucket.full())
+
+    def test_rate_zero_is_unlimited(self):
+        bucket = TokenBucket(rate=0, burst=1)
+        self.assertTrue(all(bucket.take() for _ in range(100)))
+
+
+class HostLimiterTest(unittest.TestCase):
+    def test_concurrency_cap(self):
+        limiter = HostLimiter(max_active=2, rate=0, burst=10)
+        self.assertIsNone(limiter.acquire('a'))
+        self.assertIsNone(limiter.acquire('a'))
+        self.assertEqual(limiter.acquire('a'), "busy")
+        self.assertIsNone(limiter.acquire('b'))
+        limiter.release('a')
+        self.assertIsNone(limiter.acquire('a'))
+
+    def test_rate_limit(self):
+        limiter = HostLimiter(max_active=0, rate=1.0, burst=2)
+        self.assertIsNone(limiter.acquire('a'))
+        self.assertIsNone(limiter.acquire('a'))
+        self.assertEqual(limiter.acquire('a'), "rate")
+        self.assertIsNone(limiter.acquire('b'))
+        # a rejected request was never admitted, so it is not counted as active
+        self.assertEqual(limiter.active, {'a': 2, 'b': 1})
+
+    def test_no_buckets_without_a_rate(self):
+        limiter = HostLimiter(max_active=4, rate=0, burst=10)
+        for host in range(1000):
+            self.assertIsNone(limiter.acquire(host))
+            limiter.release(host)
+        self.assertEqual(limiter.buckets, {})
+        self.assertEqual(limiter.active, {})
+
+    def test_release_drops_idle_full_bucket(self):
+        limiter = HostLimiter(max_active=0, rate=1.0, burst=2)
+        limiter.acquire('a')
+        limiter.release('a')
+        self.assertIn('a', limiter.buckets)   # still down a token
+        limiter.acquire('a')
+        age(limiter.buckets['a'], 10.0)
+        limiter.release('a')
+        self.assertNotIn('a', limiter.buckets)
+
+    def test_idle_buckets_are_swept(self):
+        limiter = HostLimiter(max_active=0, rate=1.0, burst=2)
+        for host in range(64):
+            limiter.acquire(host)
+            limiter.release(host)
+        self.assertEqual(len(limiter.buckets), 64)
+        for host in range(32):
+            age(limiter.buckets[host], 10.0)
+        limiter.acquire(64)     # one more host triggers the sweep
+        self.assertEqual(len(limiter.buckets), 33)
+        self.assertIn(40, limiter.buckets)
+        self.assertNotIn(0, limiter.buckets)
+
+
+class StalledProxy(Proxy):
+    """A proxy whose workers hang on every request until `resume` is set."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.resume = threading.Event()
+        self.handling = threading.Semaphore(0)
+
+    def handle_client(self, conn):
+        self.handling.release()
+        self.resume.wait(10)
+
+
+def start(proxy):
+    """Run proxy.serve() on an ephemeral port, quietly, in the background."""
+    def serve():
+        with contextlib.redirect_stdout(io.StringIO()):
+            proxy.serve()
+    threading.Thread(target=serve, daemon=True).start()
+    assert proxy.listening.wait(5)
+    return proxy
+
+
+def connect(proxy):
+    return socket.create_connection(("127.0.0.1", proxy.port), timeout=5)
+
+
+def status(conn, request=None):
+    """Send request (if any), read the reply until the proxy closes it, and
+    return its status code and how long that took."""
+    started = time.monotonic()
+    with conn:
+        if request:
+            conn.sendall(request)
+        reply = bytearray()
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            reply.extend(chunk)
+    return int(reply.split()[1]), time.monotonic() - started
+
+
+class ServeTest(unittest.TestCase):
+    def stalled(self, **limits):
+        proxy = start(StalledProxy(0, workers=1, queue_size=1, timeout=5, **limits))
+        self.addCleanup(proxy.resume.set)
+        held = connect(proxy)
+        self.addCleanup(held.close)
+        self.assertTrue(proxy.handling.acquire(timeout=5))   # the only worker is stuck
+        return proxy
+
+    def test_queue_full_is_a_fast_503(self):
+        proxy = self.stalled(client_limit=0)
+        queued = connect(proxy)
+        self.addCleanup(queued.close)
+        code, elapsed = status(connect(proxy))
+        self.assertEqual(code, 503)
+        self.assertLess(elapsed, 1.0)
+        # the held and the queued connection keep their slots; the shed one gave its back
+        self.assertEqual(proxy.clients.active, {"127.0.0.1": 2})
+
+    def test_client_over_its_limit_gets_429(self):
+        proxy = self.stalled(client_limit=1)
+        code, elapsed = status(connect(proxy))
+        self.assertEqual(code, 429)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(proxy.clients.active, {"127.0.0.1": 1})
+
+    def test_busy_origin_gets_503(self):
+        proxy = start(Proxy(0, workers=1, origin_limit=1, timeout=5))
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        proxy.cache_dir = Path(cache.name)
+        origin = ("origin.invalid", 80)
+        self.assertIsNone(proxy.origins.acquire(origin))   # a fetch in progress
+        code, _ = status(connect(proxy),
+                         b"GET http://origin.invalid/page.html HTTP/1.1\r\n\r\n")
+        self.assertEqual(code, 503)
+        self.assertEqual(proxy.origins.active, {origin: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()